@@ -0,0 +1,211 @@
+import threading
+import collections
+
+from clock_service import get_clock
+from console_colors import (
+    black_on_brown,
+    black_on_yellow,
+    white_on_red
+)
+from latency_stats import STAGE_ACTION_CONFIRMED, STAGE_ACTION_STARTED
+from pounce_engine import (
+    ACTION_ENABLE_TX,
+    ACTION_HALT_TX,
+    ACTION_PREPARE,
+    ACTION_QSY,
+    ACTION_SET_TX_PERIOD
+)
+
+# Une seule intention en attente par action: la plus récente remplace les précédentes
+coalesced_actions = (ACTION_PREPARE, ACTION_SET_TX_PERIOD, ACTION_ENABLE_TX, ACTION_HALT_TX, ACTION_QSY)
+
+# Actions liées à l'indicatif visé, obsolètes dès que la cible change
+target_actions = (ACTION_PREPARE, ACTION_SET_TX_PERIOD, ACTION_ENABLE_TX)
+
+# Intervalle de vérification de stop_event pendant une action
+stop_poll_interval = 0.05
+
+# Exécuteur du thread courant, pour les pauses interruptibles des backends
+current_action = threading.local()
+
+class ActionCancelled(Exception):
+    pass
+
+def interrupts(previous, intent):
+    # Une action en cours devient obsolète si la cible change ou si l'émission est arrêtée
+    if previous.action in target_actions and intent.action in target_actions and previous.callsign != intent.callsign:
+        return True
+    return intent.action == ACTION_HALT_TX and previous.action in (ACTION_SET_TX_PERIOD, ACTION_ENABLE_TX)
+
+def supersedes(previous, intent):
+    if previous.action == intent.action and previous.action in coalesced_actions:
+        return True
+    return interrupts(previous, intent)
+
+def pause(duration):
+    # Pause des backends d'automatisation: interrompue par stop_event ou par l'annulation
+    # de l'action en cours lorsqu'elle est exécutée par un ActionExecutor
+    executor = getattr(current_action, 'executor', None)
+    if executor is None:
+        get_clock().sleep(duration)
+    else:
+        executor.wait(duration)
+
+class ActionExecutor:
+    # Exécution des intentions du moteur dans un thread dédié: l'analyse des décodages
+    # se poursuit pendant les clics. Les intentions en attente sont regroupées
+    # et celles devenues obsolètes sont annulées. Avec un SlotClock, une intention
+    # planifiée attend le début de sa fenêtre et celle dont l'échéance est dépassée
+    # est reportée à la séquence suivante de même parité
+    def __init__(self, handle, stop_event=None, slot_clock=None, clock=None):
+        self.handle = handle
+        self.stop_event = stop_event if stop_event is not None else threading.Event()
+        self.slot_clock = slot_clock
+        self.clock = clock if clock is not None else get_clock()
+
+        self.pending = collections.deque()
+        self.condition = threading.Condition()
+        self.running_intent = None
+        self.cancel_event = threading.Event()
+        self.announced_intent = None
+        self.thread = None
+        self.closed = False
+
+        self.executed = 0
+        self.coalesced = 0
+        self.cancelled = 0
+        self.deferred = 0
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, name="ActionExecutor", daemon=True)
+        self.thread.start()
+
+    def submit(self, intent):
+        if self.thread is None:
+            # Avant le démarrage du thread, exécution immédiate: le moteur attend
+            # le résultat de la préparation initiale
+            return self.handle(intent)
+
+        if intent.trace is not None:
+            # La mesure des latences est terminée par le thread d'exécution
+            intent.trace.asynchronous = True
+
+        with self.condition:
+            kept = []
+            for pending in self.pending:
+                if not supersedes(pending, intent):
+                    kept.append(pending)
+                elif pending.trace is not None:
+                    # Mesure conservée jusqu'à la décision
+                    pending.trace.finish()
+            self.coalesced += len(self.pending) - len(kept)
+            self.pending = collections.deque(kept)
+            self.pending.append(intent)
+
+            if self.running_intent is not None and interrupts(self.running_intent, intent):
+                self.cancel_event.set()
+
+            self.condition.notify()
+
+        return None
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set() or self.stop_event.is_set()
+
+    def wait(self, duration):
+        deadline = self.clock.monotonic() + duration
+        while not self.is_cancelled():
+            remaining = deadline - self.clock.monotonic()
+            if remaining <= 0:
+                return
+            self.clock.wait(self.cancel_event, min(remaining, stop_poll_interval))
+        raise ActionCancelled()
+
+    def delay_before(self, intent):
+        if self.slot_clock is None or intent.not_before is None:
+            return 0
+
+        now = self.slot_clock.now()
+        if intent.deadline is not None and now > intent.deadline and intent.period is not None:
+            # Trop tard pour cette séquence: pas d'émission tronquée
+            intent.not_before, intent.deadline = self.slot_clock.schedule(intent.period, now)
+            self.deferred += 1
+            self.announced_intent = None
+
+        delay = intent.not_before - now
+        if delay > 0 and self.announced_intent is not intent:
+            self.announced_intent = intent
+            print(f"{intent.action} {intent.callsign or ''} différé à {self.slot_clock.format_time(intent.not_before)} {black_on_brown('[' + str(intent.period) + ']')}")
+        return delay
+
+    def next_intent(self):
+        with self.condition:
+            while True:
+                while not self.pending:
+                    if self.closed or self.stop_event.is_set():
+                        return None
+                    self.condition.wait(stop_poll_interval)
+
+                # Arrêt demandé: les intentions en attente sont abandonnées
+                if self.stop_event.is_set():
+                    self.cancelled += len(self.pending)
+                    self.pending.clear()
+                    return None
+
+                # L'intention planifiée reste en tête de file pendant l'attente,
+                # une intention plus récente peut encore la remplacer
+                delay = self.delay_before(self.pending[0])
+                if delay <= 0:
+                    break
+                if self.closed:
+                    # Arrêt du monitoring: inutile d'attendre la séquence suivante
+                    self.pending.popleft()
+                    self.cancelled += 1
+                    continue
+                self.condition.wait(min(delay, stop_poll_interval))
+
+            intent = self.pending.popleft()
+            self.running_intent = intent
+            self.cancel_event.clear()
+            return intent
+
+    def run(self):
+        current_action.executor = self
+
+        while True:
+            intent = self.next_intent()
+            if intent is None:
+                break
+
+            if intent.trace is not None:
+                intent.trace.mark(STAGE_ACTION_STARTED)
+
+            try:
+                intent.result = self.handle(intent)
+                self.executed += 1
+                if intent.trace is not None:
+                    intent.trace.mark(STAGE_ACTION_CONFIRMED)
+            except ActionCancelled:
+                self.cancelled += 1
+                print(f"{black_on_yellow('Action annulée')} {intent.action} {intent.callsign or ''}")
+            except SystemExit:
+                # Erreur bloquante d'un backend: arrêt du monitoring comme auparavant
+                print(white_on_red(f"Arrêt demandé pendant l'action {intent.action}"))
+                self.stop_event.set()
+            except Exception as e:
+                print(white_on_red(f"Erreur lors de l'action {intent.action}: {e}"))
+            finally:
+                with self.condition:
+                    self.running_intent = None
+                if intent.trace is not None:
+                    intent.trace.finish()
+
+    def close(self):
+        # Les intentions en attente sont exécutées avant l'arrêt, sauf si stop_event est levé
+        if self.thread is None:
+            return
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+        self.thread = None
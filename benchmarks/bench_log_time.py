@@ -0,0 +1,90 @@
+import os
+import re
+import sys
+import time
+import argparse
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import log_analysis
+
+utc = datetime.timezone.utc
+
+# Ancienne implémentation de get_log_time, conservée comme référence
+def legacy_get_log_time(log_time_str):
+    log_time = None
+
+    try:
+        if re.match(r'^\d{8}_\d{6}', log_time_str):
+            match = re.match(r'^\d{8}_\d{6}', log_time_str)
+            log_time = datetime.datetime.strptime(match.group(0), "%Y%m%d_%H%M%S")
+        elif re.match(r'^\d{6}_\d{6}', log_time_str):
+            log_time = datetime.datetime.strptime(log_time_str, "%y%m%d_%H%M%S")
+
+        if log_time:
+            log_time = log_time.replace(tzinfo=utc)
+    except Exception as e:
+        print(f"Problème de formattage: {log_time_str}")
+
+    return log_time
+
+def legacy_time_filter(log_time_strs, get_log_time):
+    # Ancienne boucle: datetime.now() recalculé pour chaque ligne
+    count = 0
+    for log_time_str in log_time_strs:
+        log_time = get_log_time(log_time_str)
+        if (datetime.datetime.now(utc) - log_time).total_seconds() < 600:
+            count += 1
+    return count
+
+def time_filter(log_time_strs, get_log_time):
+    count = 0
+    now = datetime.datetime.now(utc)
+    for log_time_str in log_time_strs:
+        log_time = get_log_time(log_time_str)
+        if (now - log_time).total_seconds() < 600:
+            count += 1
+    return count
+
+def build_timestamps(number_of_lines, decodes_per_slot, time_format):
+    start = datetime.datetime(2024, 10, 12, 14, 30, 0)
+    return [
+        (start + datetime.timedelta(seconds=15 * (index // decodes_per_slot))).strftime(time_format)
+        for index in range(number_of_lines)
+    ]
+
+def measure(function, log_time_strs, repeat):
+    best = None
+    for _ in range(repeat):
+        log_analysis.last_log_time_cache = (None, None)
+        start = time.perf_counter()
+        function(log_time_strs)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return len(log_time_strs) / best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'analyse des horodatages de ALL.TXT")
+    parser.add_argument("--lines", type=int, default=200000, help="Nombre de lignes")
+    parser.add_argument("--decodes-per-slot", type=int, default=25, help="Nombre de décodages par séquence FT8")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre de mesures")
+    args = parser.parse_args()
+
+    for name, time_format in (("JTDX", "%Y%m%d_%H%M%S"), ("WSJT", "%y%m%d_%H%M%S")):
+        for decodes_per_slot in (args.decodes_per_slot, 1):
+            log_time_strs = build_timestamps(args.lines, decodes_per_slot, time_format)
+
+            results = {
+                'get_log_time avant': measure(lambda l: [legacy_get_log_time(s) for s in l], log_time_strs, args.repeat),
+                'get_log_time après': measure(lambda l: [log_analysis.get_log_time(s) for s in l], log_time_strs, args.repeat),
+                'filtre 10 min avant': measure(lambda l: legacy_time_filter(l, legacy_get_log_time), log_time_strs, args.repeat),
+                'filtre 10 min après': measure(lambda l: time_filter(l, log_analysis.get_log_time), log_time_strs, args.repeat),
+            }
+
+            print(f"\n{name}, {decodes_per_slot} décodage(s) par séquence")
+            for label, lines_per_second in results.items():
+                print(f"{label:<22} {lines_per_second:>14,.0f} lignes/s")
+
+if __name__ == "__main__":
+    main()
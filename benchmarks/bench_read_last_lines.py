@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_reader import read_last_lines
+
+# Ligne type d'un ALL.TXT JTDX
+sample_line = "20241012_143015 -12  0.2 1234 ~ CQ 3Y0J JD15          *\n"
+
+def create_synthetic_log(file_path, size_in_mb):
+    block = sample_line * 10000
+    target_size = size_in_mb * 1024 * 1024
+
+    with open(file_path, 'w', encoding='utf-8') as file:
+        written = 0
+        while written < target_size:
+            file.write(block)
+            written += len(block)
+
+def readlines_last_lines(file_path, number_of_lines):
+    with open(file_path, 'r', encoding='utf-8') as file:
+        lines = file.readlines()
+    return lines[-number_of_lines:]
+
+def measure(function, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de lecture des dernières lignes d'un ALL.TXT")
+    parser.add_argument("--file", help="Fichier ALL.TXT existant à utiliser")
+    parser.add_argument("--size-mb", type=int, default=1024, help="Taille du fichier synthétique (Mo)")
+    parser.add_argument("--lines", type=int, default=100, help="Nombre de lignes à lire")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre de mesures")
+    args = parser.parse_args()
+
+    temporary_dir = None
+    file_path = args.file
+
+    if file_path is None:
+        temporary_dir = tempfile.TemporaryDirectory()
+        file_path = os.path.join(temporary_dir.name, "ALL.TXT")
+        print(f"Création d'un fichier synthétique de {args.size_mb} Mo...")
+        create_synthetic_log(file_path, args.size_mb)
+
+    try:
+        print(f"Fichier: {file_path} ({os.path.getsize(file_path):,} octets)")
+
+        results = {
+            'readlines()[-N:]': measure(lambda: readlines_last_lines(file_path, args.lines), args.repeat),
+            'read_last_lines (seek)': measure(lambda: read_last_lines(file_path, args.lines), args.repeat),
+            'read_last_lines (mmap)': measure(lambda: read_last_lines(file_path, args.lines, use_mmap=True), args.repeat),
+        }
+
+        reference = results['readlines()[-N:]']
+        for name, duration in results.items():
+            print(f"{name:<26} {duration * 1000:>12.3f} ms  x{reference / duration:,.0f}")
+    finally:
+        if temporary_dir:
+            temporary_dir.cleanup()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,386 @@
+import io
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import platform
+import argparse
+import datetime
+import tempfile
+import threading
+import contextlib
+
+benchmarks_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(benchmarks_path))
+sys.path.insert(0, os.path.join(os.path.dirname(benchmarks_path), "tools"))
+
+import log_analysis
+import wait_and_pounce
+from band_generator import BandActivity, format_jtdx_line, slot_duration, slot_parity
+from clock_service import VirtualClock, set_clock, system_clock
+from decode_record import parse_decode_line
+from fake_automation import FakeAutomation
+from log_analysis import (
+    build_sequences,
+    decode_sequence,
+    extract_callsign,
+    get_log_time
+)
+from message_classifier import classify_message, classify_sequence
+
+# Mesures du chemin critique de l'analyse, comparées à une référence enregistrée
+# par machine: un résultat inférieur à la référence au-delà du seuil est signalé.
+# Tous les résultats sont en opérations par seconde (plus haut = meilleur)
+
+baselines_path = os.path.join(benchmarks_path, "baselines")
+
+# Baisse tolérée par rapport à la référence avant de signaler une régression
+default_threshold = 0.15
+
+your_callsign = "F5UKW"
+wanted_callsign = "K1ABC"
+start_time = datetime.datetime(2026, 10, 18, 12, 0, 0, tzinfo=datetime.timezone.utc)
+
+# Taille du fichier de log pour find_sequences: seules les dernières lignes sont lues,
+# le temps ne dépend pas de la taille. Un seul gros fichier, une lecture complète
+# réintroduite apparaît comme une régression par rapport à la référence
+find_sequences_lines = 1000000
+
+def machine_id():
+    return f"{platform.node() or 'machine'}-py{sys.version_info[0]}{sys.version_info[1]}"
+
+def machine_info():
+    return {
+        'node': platform.node(),
+        'system': platform.system(),
+        'release': platform.release(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'python': platform.python_version(),
+    }
+
+def best_rate(function, operations, repeat):
+    # Meilleur débit sur plusieurs mesures, le moins perturbé par le reste du système
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return operations / best if best > 0 else None
+
+def generate_lines(number_of_lines, decodes_per_slot=40, seed=1):
+    # Activité synthétique, le CQ du DX recherché dans la dernière séquence
+    band = BandActivity(station_count=max(200, decodes_per_slot * 4), decodes_per_slot=decodes_per_slot, seed=seed)
+    lines = []
+    slot = 0
+    while len(lines) < number_of_lines:
+        moment = start_time + datetime.timedelta(seconds=slot * slot_duration)
+        time_str = moment.strftime('%Y%m%d_%H%M%S')
+        for decode in band.next_slot(slot_parity(moment)):
+            lines.append(format_jtdx_line(time_str, decode))
+        slot += 1
+    del lines[number_of_lines - 1:]
+    lines.append(format_jtdx_line(time_str, (-12, 0.2, 1500, f"CQ {wanted_callsign} FN42")))
+    return lines
+
+def last_line_time(lines):
+    return parse_decode_line(lines[-1]).log_time
+
+def bench_get_log_time(repeat, quick):
+    lines = generate_lines(20000 if quick else 200000)
+    log_time_strs = [line.split(' ', 1)[0] for line in lines]
+
+    def run():
+        log_analysis.last_log_time_cache = (None, None)
+        for log_time_str in log_time_strs:
+            get_log_time(log_time_str)
+
+    return best_rate(run, len(log_time_strs), repeat)
+
+def bench_decode_sequence(repeat, quick):
+    lines = generate_lines(5000 if quick else 50000)
+    records = [parse_decode_line(line) for line in lines]
+
+    # Analyse de la ligne brute et affichage d'un DecodeRecord déjà analysé
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for line in lines:
+                decode_sequence(line, "JTDX")
+            for record in records:
+                decode_sequence(record, "JTDX")
+
+    return best_rate(run, len(lines) * 2, repeat)
+
+def bench_extract_callsign(repeat, quick):
+    lines = generate_lines(5000 if quick else 50000)
+    patterns = ["CQ K1*", "F5UKW *", "* RR73"]
+
+    def run():
+        for line in lines:
+            for pattern in patterns:
+                extract_callsign(line, pattern)
+
+    return best_rate(run, len(lines) * len(patterns), repeat)
+
+def bench_build_sequences(repeat, quick):
+    # generate_sequences n'existe plus: les séquences sont construites par
+    # build_sequences et reconnues par classify_sequence sur les messages classifiés
+    lines = generate_lines(5000 if quick else 50000)
+    callsigns = [parse_decode_line(line).tokens for line in lines]
+
+    def run():
+        for tokens in callsigns:
+            build_sequences(your_callsign, wanted_callsign)
+            classify_sequence(classify_message(tokens), your_callsign, wanted_callsign)
+
+    return best_rate(run, len(callsigns), repeat)
+
+def bench_find_sequences(repeat, quick, work_path):
+    number_of_lines = find_sequences_lines
+    if quick:
+        number_of_lines //= 10
+
+    file_path = os.path.join(work_path, "ALL.TXT")
+    lines = generate_lines(number_of_lines, seed=number_of_lines)
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.writelines(lines)
+
+    # Analyse à l'heure du dernier décodage, comme en direct
+    clock = VirtualClock(last_line_time(lines).timestamp() + 13)
+    set_clock(clock)
+    wait_and_pounce.last_monitor_time = start_time - datetime.timedelta(minutes=1)
+    calls = 20 if quick else 200
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(calls):
+                if wait_and_pounce.find_sequences(file_path, your_callsign, wanted_callsign) is None:
+                    raise RuntimeError("séquence attendue non trouvée")
+
+    try:
+        return best_rate(run, calls, repeat)
+    finally:
+        set_clock(system_clock)
+
+def bench_monitor_file(repeat, quick, work_path):
+    # Itérations complètes de monitor_file avec une instance JTDX simulée:
+    # délai entre l'écriture d'une séquence et l'activation de l'émission
+    iterations = 10 if quick else 40
+    window_title = "JTDX - benchmark"
+    file_path = os.path.join(work_path, "monitor", "ALL.TXT")
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+
+    now = time.time()
+    slot_start = now - now % slot_duration
+    clock = VirtualClock(slot_start - 10 * slot_duration)
+    set_clock(clock)
+
+    saved_wait_time = wait_and_pounce.wait_time
+    wait_and_pounce.wait_time = 0.001
+    gui = FakeAutomation(clock=clock)
+    instance = gui.add_instance(window_title, 'JTDX')
+    wait_and_pounce.set_automation_backend(gui)
+
+    band = BandActivity(station_count=400, decodes_per_slot=40, seed=7)
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write(format_jtdx_line(time.strftime('%Y%m%d_%H%M%S', time.gmtime(clock.time() - slot_duration)), (-10, 0.1, 800, "CQ DL2ZZ JO31")))
+
+    stop_event = threading.Event()
+    output = io.StringIO()
+    monitor = threading.Thread(
+        target=wait_and_pounce.monitor_file,
+        args=(file_path, window_title, 'JTDX', lambda tracking: None, None, None,
+              your_callsign, [wanted_callsign], "Normal", stop_event),
+        daemon=True
+    )
+
+    durations = []
+    try:
+        with contextlib.redirect_stdout(output):
+            monitor.start()
+            time.sleep(0.2)
+
+            for iteration in range(iterations):
+                # Séquence suivante: l'heure virtuelle est placée juste après son début,
+                # l'émission sur la période opposée est alors possible immédiatement
+                moment = slot_start + (iteration - 8) * slot_duration
+                clock.advance_to(moment + 1)
+                time_str = time.strftime('%Y%m%d_%H%M%S', time.gmtime(moment))
+                decodes = band.next_slot(slot_parity(datetime.datetime.fromtimestamp(moment, datetime.timezone.utc)))
+                decodes.append((-12, 0.2, 1500, f"CQ {wanted_callsign} FN42"))
+
+                instance.tx_enabled = False
+                start = time.perf_counter()
+                with open(file_path, 'a', encoding='utf-8') as file:
+                    file.write("".join(format_jtdx_line(time_str, decode) for decode in decodes))
+
+                while not instance.tx_enabled:
+                    if time.perf_counter() - start > 5:
+                        raise RuntimeError("Enable TX non activé par monitor_file")
+                    time.sleep(0.0005)
+                durations.append(time.perf_counter() - start)
+    finally:
+        stop_event.set()
+        monitor.join(5)
+        wait_and_pounce.wait_time = saved_wait_time
+        wait_and_pounce.set_automation_backend(None)
+        set_clock(system_clock)
+
+    # Médiane plutôt que meilleur résultat: l'attente du système de fichiers varie
+    durations.sort()
+    return 1 / durations[len(durations) // 2]
+
+class FakeTextWidget:
+    # Zone de texte Tk réduite à ce qu'utilise DebugRedirector
+    def __init__(self):
+        self.chunks = []
+
+    def insert(self, index, text, tag=None):
+        self.chunks.append(text)
+
+    def see(self, index):
+        pass
+
+    def get(self, start, end):
+        return "".join(self.chunks[-1:])
+
+    def after(self, delay, function, *args):
+        function(*args)
+
+class FakeButton:
+    def config(self, **options):
+        pass
+
+def bench_debug_redirector(repeat, quick, work_path):
+    try:
+        from debug_redirector import DebugRedirector
+    except ImportError:
+        # tkinter absent
+        return None
+
+    lines = [
+        f"Séquence trouvée [black_on_brown]CQ {wanted_callsign}[/black_on_brown] [bright_green][ODD][/bright_green]. Activation de la fenêtre et check état.\n",
+        "[black_on_yellow]Enable TX[/black_on_yellow] inactif. Clic pour passage à l'état [white_on_red]Enable TX[/white_on_red] actif.\n",
+        "Fenêtre identifiée et correctement positionnée [bright_green][prepare_jtdx][/bright_green].\n",
+        "Mise à jours de la fréquence: [black_on_purple]14,074Mhz[/black_on_purple]\n",
+    ] * (250 if quick else 2500)
+    log_filename = os.path.join(work_path, "debug_redirector.log")
+
+    def run():
+        gui_queue = queue.Queue()
+        redirector = DebugRedirector(FakeTextWidget(), log_filename, gui_queue, FakeButton())
+        for line in lines:
+            redirector.write(line)
+        # Traitement de la file comme process_gui_queue
+        while not gui_queue.empty():
+            gui_queue.get_nowait()()
+
+    return best_rate(run, len(lines), repeat)
+
+def run_benchmarks(selected, repeat, quick):
+    work_path = tempfile.mkdtemp(prefix="pounce_bench_")
+    cases = {
+        'get_log_time': lambda: bench_get_log_time(repeat, quick),
+        'decode_sequence': lambda: bench_decode_sequence(repeat, quick),
+        'extract_callsign': lambda: bench_extract_callsign(repeat, quick),
+        'build_sequences': lambda: bench_build_sequences(repeat, quick),
+        'find_sequences': lambda: bench_find_sequences(repeat, quick, work_path),
+        'monitor_file': lambda: bench_monitor_file(repeat, quick, work_path),
+        'debug_redirector': lambda: bench_debug_redirector(repeat, quick, work_path),
+    }
+    units = {
+        'find_sequences': "appels/s",
+        'monitor_file': "itérations/s",
+    }
+
+    results = {}
+    try:
+        for name, case in cases.items():
+            if selected and name not in selected:
+                continue
+            start = time.perf_counter()
+            results[name] = case()
+            duration = time.perf_counter() - start
+            value = f"{results[name]:>14,.1f}" if results[name] is not None else f"{'-':>14}"
+            print(f"{name:<22} {value} {units.get(name, 'op/s'):<13} ({duration:.1f}s)")
+    finally:
+        shutil.rmtree(work_path, ignore_errors=True)
+    return results
+
+def baseline_file(machine):
+    return os.path.join(baselines_path, f"{machine}.json")
+
+def load_baseline(machine):
+    file_path = baseline_file(machine)
+    if not os.path.exists(file_path):
+        return None
+    with open(file_path, 'r', encoding='utf-8') as file:
+        return json.load(file)
+
+def save_baseline(machine, results, quick):
+    os.makedirs(baselines_path, exist_ok=True)
+    baseline = load_baseline(machine) or {'machine': machine_info(), 'results': {}}
+    baseline['machine'] = machine_info()
+    baseline['quick'] = quick
+    baseline['saved_at'] = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds')
+    baseline['results'].update({name: value for name, value in results.items() if value is not None})
+    with open(baseline_file(machine), 'w', encoding='utf-8') as file:
+        json.dump(baseline, file, indent=2, sort_keys=True)
+    return baseline_file(machine)
+
+def compare(results, baseline, threshold):
+    # Liste des régressions: (mesure, référence, résultat, écart relatif)
+    regressions = []
+    print(f"\n{'Mesure':<22} {'Référence':>14} {'Résultat':>14} {'Ecart':>8}")
+    for name, value in results.items():
+        reference = baseline['results'].get(name)
+        if reference is None or value is None:
+            continue
+        change = value / reference - 1
+        flag = ""
+        if change < -threshold:
+            flag = " REGRESSION"
+            regressions.append((name, reference, value, change))
+        print(f"{name:<22} {reference:>14,.1f} {value:>14,.1f} {change:>+8.1%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks du chemin critique de l'analyse, comparés à une référence par machine")
+    parser.add_argument("--only", help="Mesures à exécuter, séparées par des virgules")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre de mesures par cas")
+    parser.add_argument("--quick", action="store_true", help="Volumes réduits (fichier de log de 100k lignes)")
+    parser.add_argument("--save", action="store_true", help="Enregistrer les résultats comme référence de cette machine")
+    parser.add_argument("--threshold", type=float, default=default_threshold, help="Baisse tolérée avant de signaler une régression (0.15 = 15%%)")
+    parser.add_argument("--machine", default=machine_id(), help="Nom de la référence (par défaut hôte et version de Python)")
+    parser.add_argument("--output", help="Résultats enregistrés en JSON")
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.only.split(",")] if args.only else None
+    print(f"Machine {args.machine}, Python {platform.python_version()}{', volumes réduits' if args.quick else ''}\n")
+    results = run_benchmarks(selected, args.repeat, args.quick)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({'machine': machine_info(), 'quick': args.quick, 'results': results}, file, indent=2)
+
+    baseline = load_baseline(args.machine)
+    regressions = []
+    if baseline is None:
+        print(f"\nAucune référence pour {args.machine} (--save pour l'enregistrer)")
+    else:
+        if baseline.get('quick', False) != args.quick:
+            print("\nAttention: référence et mesures avec des volumes différents (--quick)")
+        regressions = compare(results, baseline, args.threshold)
+
+    if args.save:
+        print(f"\nRéférence enregistrée: {save_baseline(args.machine, results, args.quick)}")
+
+    if regressions:
+        print(f"\n{len(regressions)} régression(s) au-delà de {args.threshold:.0%}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import os
+import sys
+import time
+import random
+import struct
+import argparse
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wsjtx_protocol
+from wsjtx_protocol import (
+    Decode,
+    MessageEncoder,
+    QSOLogged,
+    Reply,
+    Status,
+    decode_message,
+    encode_message,
+    message_classes
+)
+
+utc = datetime.timezone.utc
+
+# Le dépôt n'a pas de suite de tests: les vérifications aller-retour du codec
+# sont faites ici avant les mesures (--check-only pour ne faire qu'elles)
+
+alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 /<>;+-~éèàüΣЖ漢📡"
+
+def random_text(rng):
+    if rng.random() < 0.05:
+        return None
+    return "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+
+def random_datetime(rng):
+    if rng.random() < 0.1:
+        return None
+    moment = datetime.datetime(2000, 1, 1, tzinfo=utc) + datetime.timedelta(milliseconds=rng.randint(0, 40 * 365 * 86400 * 1000))
+    return moment
+
+def random_color(rng):
+    if rng.random() < 0.2:
+        return None
+    return (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))
+
+random_values = {
+    wsjtx_protocol.BOOL: lambda rng: rng.random() < 0.5,
+    wsjtx_protocol.QUINT8: lambda rng: rng.randint(0, 0xff),
+    wsjtx_protocol.QINT32: lambda rng: rng.randint(-0x80000000, 0x7fffffff),
+    wsjtx_protocol.QUINT32: lambda rng: rng.randint(0, 0xffffffff),
+    wsjtx_protocol.QUINT64: lambda rng: rng.randint(0, 0xffffffffffffffff),
+    wsjtx_protocol.DOUBLE: lambda rng: rng.uniform(-1e6, 1e6),
+    wsjtx_protocol.UTF8: random_text,
+    wsjtx_protocol.QDATETIME: random_datetime,
+    wsjtx_protocol.QCOLOR: random_color,
+}
+
+def random_message(message_class, rng):
+    values = [random_values[field_type](rng) for _, field_type, _ in message_class.fields]
+    return message_class(random_text(rng), *values)
+
+def check_round_trips(iterations, seed):
+    rng = random.Random(seed)
+    encoder = MessageEncoder()
+    failures = 0
+
+    for message_class in message_classes:
+        for _ in range(iterations):
+            message = random_message(message_class, rng)
+            packet = encode_message(message)
+
+            # Aller-retour depuis bytes, bytearray et memoryview
+            for data in (packet, bytearray(packet), memoryview(packet)):
+                decoded = decode_message(data)
+                if decoded is None or decoded[0] != message_class.message_type or decoded[1] != message:
+                    failures += 1
+                    print(f"ERREUR aller-retour {message_class.__name__}: {message!r} -> {decoded!r}")
+                    break
+
+            # Le tampon préalloué produit les mêmes octets, et le réencodage est identique
+            if bytes(encoder.encode(message)) != packet or encode_message(decode_message(packet)[1]) != packet:
+                failures += 1
+                print(f"ERREUR réencodage {message_class.__name__}: {message!r}")
+
+            # Un datagramme tronqué ne doit jamais lever d'exception
+            for size in range(len(packet)):
+                decoded = decode_message(packet[:size])
+                if decoded is not None and decoded[1] is not None:
+                    # Seule une troncature sur un champ optionnel est acceptable
+                    fields = message_class.fields
+                    first_optional_field = message_class.first_optional_field
+                    if first_optional_field is None:
+                        failures += 1
+                        print(f"ERREUR troncature {message_class.__name__} à {size} octets")
+                        break
+                    for name, _, _ in fields[:first_optional_field]:
+                        if getattr(decoded[1], name) != getattr(message, name):
+                            failures += 1
+                            print(f"ERREUR troncature {message_class.__name__} à {size} octets")
+                            break
+
+    # Messages invalides
+    for data in (b"", b"\x00" * 12, struct.pack('>III', 0x12345678, 2, 2), struct.pack('>IIII', wsjtx_protocol.MAGIC, 2, 2, 0xfffffff0)):
+        if decode_message(data) is not None:
+            failures += 1
+            print(f"ERREUR message invalide accepté: {data!r}")
+
+    # Type inconnu: en-tête valide, message non décodé
+    unknown = struct.pack('>III', wsjtx_protocol.MAGIC, 2, 99) + struct.pack('>I', 1) + b"X"
+    if decode_message(unknown) != (99, None):
+        failures += 1
+        print("ERREUR type inconnu")
+
+    return failures
+
+# Décodage naïf d'un message Decode, avec copie de chaque tranche en bytes
+def naive_decode(data):
+    offset = 0
+    magic, schema, message_type = struct.unpack('>III', data[offset:offset + 12])
+    offset += 12
+
+    def read_string(offset):
+        length = struct.unpack('>I', data[offset:offset + 4])[0]
+        offset += 4
+        return data[offset:offset + length].decode('utf-8'), offset + length
+
+    id, offset = read_string(offset)
+    new = struct.unpack('>?', data[offset:offset + 1])[0]
+    time_ms = struct.unpack('>I', data[offset + 1:offset + 5])[0]
+    snr = struct.unpack('>i', data[offset + 5:offset + 9])[0]
+    delta_time = struct.unpack('>d', data[offset + 9:offset + 17])[0]
+    delta_frequency = struct.unpack('>I', data[offset + 17:offset + 21])[0]
+    offset += 21
+    mode, offset = read_string(offset)
+    message, offset = read_string(offset)
+    return id, new, time_ms, snr, delta_time, delta_frequency, mode, message
+
+def measure(function, count, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return count / best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du codec du protocole UDP de WSJT-X")
+    parser.add_argument("--packets", type=int, default=100000, help="Nombre de messages par mesure")
+    parser.add_argument("--iterations", type=int, default=200, help="Messages aléatoires vérifiés par type")
+    parser.add_argument("--seed", type=int, default=1, help="Graine des messages aléatoires")
+    parser.add_argument("--repeat", type=int, default=3, help="Nombre de mesures")
+    parser.add_argument("--check-only", action="store_true", help="Vérifications aller-retour uniquement")
+    args = parser.parse_args()
+
+    failures = check_round_trips(args.iterations, args.seed)
+    print(f"Aller-retour: {len(message_classes)} types x {args.iterations} messages, {failures} erreur(s)")
+    if failures:
+        sys.exit(1)
+    if args.check_only:
+        return
+
+    decode_packet = encode_message(Decode("WSJT-X", True, 45015000, -12, 0.2, 1234, "~", "F5UKW K1ABC -05"))
+    status_packet = encode_message(Status("WSJT-X", 14074000, "FT8", "K1ABC", "-05", "FT8", True, False, True, 1500, 1500, "F5UKW", "JN03", "FN42"))
+    qso_logged_packet = encode_message(QSOLogged("WSJT-X", datetime.datetime.now(utc), "K1ABC", "FN42", 14074000, "FT8", "-05", "-12"))
+    decode_view = memoryview(bytearray(decode_packet))
+    reply = Reply("WSJT-X", 45015000, -12, 0.2, 1234, "~", "F5UKW K1ABC -05")
+    encoder = MessageEncoder()
+
+    packets = args.packets
+    results = {
+        'Decode naïf (copies)': measure(lambda: [naive_decode(decode_packet) for _ in range(packets)], packets, args.repeat),
+        'Decode (bytes)': measure(lambda: [decode_message(decode_packet) for _ in range(packets)], packets, args.repeat),
+        'Decode (memoryview)': measure(lambda: [decode_message(decode_view) for _ in range(packets)], packets, args.repeat),
+        'Status': measure(lambda: [decode_message(status_packet) for _ in range(packets)], packets, args.repeat),
+        'QSOLogged': measure(lambda: [decode_message(qso_logged_packet) for _ in range(packets)], packets, args.repeat),
+        'Reply encode_message': measure(lambda: [encode_message(reply) for _ in range(packets)], packets, args.repeat),
+        'Reply tampon préalloué': measure(lambda: [encoder.encode(reply) for _ in range(packets)], packets, args.repeat),
+    }
+
+    for label, packets_per_second in results.items():
+        print(f"{label:<24} {packets_per_second:>12,.0f} paquets/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import time
+import datetime
+import threading
+
+utc = datetime.timezone.utc
+
+class SystemClock:
+    # Heure UTC du système et horloge monotone pour les durées,
+    # insensible aux corrections de l'heure système (NTP, changement manuel)
+    def time(self):
+        return time.time()
+
+    def now(self):
+        return datetime.datetime.now(utc)
+
+    def monotonic(self):
+        return time.monotonic()
+
+    def sleep(self, duration):
+        time.sleep(duration)
+
+    def wait(self, event, timeout):
+        # Attente interrompue dès que l'événement est levé
+        return event.wait(timeout)
+
+class VirtualClock:
+    # Horloge simulée: le temps n'avance que sur demande, les simulations
+    # parcourent des heures d'activité en quelques secondes
+    def __init__(self, start=0.0):
+        self.current = start
+        self.lock = threading.Lock()
+
+    def time(self):
+        return self.current
+
+    def now(self):
+        return datetime.datetime.fromtimestamp(self.current, utc)
+
+    def monotonic(self):
+        return self.current
+
+    def sleep(self, duration):
+        self.advance(duration)
+
+    def wait(self, event, timeout):
+        if not event.is_set():
+            self.advance(timeout)
+        return event.is_set()
+
+    def advance(self, duration):
+        if duration > 0:
+            with self.lock:
+                self.current += duration
+
+    def advance_to(self, timestamp):
+        # Le temps ne recule jamais
+        with self.lock:
+            if timestamp > self.current:
+                self.current = timestamp
+
+system_clock = SystemClock()
+
+# Horloge commune au moteur, aux backends et à l'interface,
+# remplacée par une VirtualClock pour les simulations
+current_clock = system_clock
+
+def get_clock():
+    return current_clock
+
+def set_clock(clock):
+    global current_clock
+    current_clock = clock if clock is not None else system_clock
@@ -0,0 +1,21 @@
+# Fonction d'affichage de couleur de texte
+def black_on_purple(text):
+    return f"[black_on_purple]{text}[/black_on_purple]"
+
+def black_on_brown(text):
+    return f"[black_on_brown]{text}[/black_on_brown]"
+
+def black_on_white(text):
+    return f"[black_on_white]{text}[/black_on_white]"
+
+def black_on_yellow(text):
+    return f"[black_on_yellow]{text}[/black_on_yellow]"
+
+def white_on_red(text):
+    return f"[white_on_red]{text}[/white_on_red]"
+
+def white_on_blue(text):
+    return f"[white_on_blue]{text}[/white_on_blue]"
+
+def bright_green(text):
+    return f"[bright_green]{text}[/bright_green]"
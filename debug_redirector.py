@@ -0,0 +1,64 @@
+import re
+import datetime
+import tkinter as tk
+
+class DebugRedirector:
+    # Sortie standard affichée dans la zone de texte de l'interface (balises de couleur
+    # converties en tags) et recopiée sans balises dans le fichier de log
+    def __init__(self, widget, log_filename, gui_queue, clear_button):
+        self.widget = widget
+        self.log_filename = log_filename
+        self.gui_queue = gui_queue
+        self.clear_button = clear_button
+        self.buffer = '' 
+
+    def write(self, string):
+        self.buffer += string
+        if '\n' in self.buffer:
+            lines = self.buffer.splitlines(keepends=True)
+            for line in lines:
+                if line.endswith('\n'):
+                    clean_string = self.remove_tag_codes(line)
+                    self.write_to_log(clean_string)
+                    self.gui_queue.put(lambda l=line: self.widget.after(0, self.apply_tags, l))
+            self.buffer = lines[-1] if not lines[-1].endswith('\n') else ''
+
+        self.gui_queue.put(self.update_clear_button_state)
+
+    def update_clear_button_state(self):
+        if self.widget.get(1.0, tk.END).strip():  
+            self.clear_button.config(state=tk.NORMAL) 
+        else:
+            self.clear_button.config(state=tk.DISABLED) 
+
+    def write_to_log(self, clean_string):
+        with open(self.log_filename, "a") as log_file:
+            timestamp = datetime.datetime.now().strftime("%y%m%d_%H%M%S")
+            log_file.write(f"{timestamp} {clean_string}")
+
+    def remove_tag_codes(self, string):
+        tag_escape = re.compile(r'\[/?[a-zA-Z_]+\]')
+        return tag_escape.sub('', string)
+
+    def apply_tags(self, string):
+        tag_pattern = re.compile(r'\[(.*?)\](.*?)\[/.*?\]')
+        
+        last_pos = 0
+        for match in tag_pattern.finditer(string):
+            tag = match.group(1)  
+            text = match.group(2) 
+
+            if last_pos < match.start():
+                self.widget.insert(tk.END, string[last_pos:match.start()])
+
+            self.widget.insert(tk.END, text, tag)
+
+            last_pos = match.end()
+
+        if last_pos < len(string):
+            self.widget.insert(tk.END, string[last_pos:])
+        
+        self.widget.see(tk.END)
+
+    def flush(self):
+        pass
@@ -0,0 +1,193 @@
+import re
+
+from log_analysis import get_log_time, ends_with_even_or_odd
+from message_classifier import classify_message
+
+# Nombre de décodages conservés en mémoire
+default_ring_buffer_capacity = 1000
+
+# Séquences dont les décodages sont mémorisés pour écarter les doublons: les dernières
+# passes du décodeur peuvent être écrites pendant la séquence suivante
+dedupe_slot_count = 4
+
+# Caractère de mode utilisé par JTDX dans ALL.TXT
+jtdx_mode_markers = {
+    '~': "FT8",
+    '+': "FT4",
+    '#': "JT65",
+    '@': "JT9",
+}
+
+wsjt_decode_pattern = re.compile(r"\s+([-+]?\d+)\s+([-+]?\d*\.\d+)\s+(\d{2,4})\s+(.+)")
+
+class DecodeRecord:
+    # Une ligne de ALL.TXT analysée une seule fois
+    __slots__ = (
+        'line',
+        'log_time_str',
+        'log_time',
+        'period',
+        'direction',
+        'mode',
+        'db',
+        'dt',
+        'hz',
+        'message',
+        'tokens',
+        'messages',
+        'call1',
+        'call2',
+    )
+
+    def __init__(self, line, log_time_str, log_time, direction, mode, db, dt, hz, tokens):
+        self.line = line
+        self.log_time_str = log_time_str
+        self.log_time = log_time
+        self.period = ends_with_even_or_odd(log_time_str)
+        self.direction = direction
+        self.mode = mode
+        self.db = db
+        self.dt = dt
+        self.hz = hz
+        self.tokens = tokens
+        self.message = " ".join(tokens)
+        self.messages = classify_message(tokens)
+        if self.messages:
+            self.call1 = self.messages[0].call1
+            self.call2 = self.messages[0].call2
+        else:
+            self.call1 = None
+            self.call2 = None
+
+    def __repr__(self):
+        return f"DecodeRecord({self.line!r})"
+
+def strip_decode_flags(tokens, flags_pattern):
+    # Suppression des marqueurs de décodage AP / deep search en fin de message
+    end = len(tokens)
+    while end > 0 and flags_pattern.match(tokens[end - 1]):
+        end -= 1
+    return tokens[:end]
+
+jtdx_flags_pattern = re.compile(r'^[\*\^]')
+wsjt_flags_pattern = re.compile(r'^(\?|a\d+)$')
+
+def parse_decode_line(line):
+    line = line.rstrip('\r\n')
+
+    # Vérifier que la ligne commence par 6 chiffres
+    if not line[:6].isdigit():
+        return None
+
+    parts = line.split()
+    log_time_str = parts[0]
+    log_time = get_log_time(log_time_str)
+    if log_time is None:
+        return None
+
+    # Format WSJT-X: date fréquence Rx/Tx mode dB DT Hz message
+    if len(parts) >= 8 and parts[2] in ('Rx', 'Tx'):
+        tokens = strip_decode_flags(parts[7:], wsjt_flags_pattern)
+        return DecodeRecord(line, log_time_str, log_time, parts[2], parts[3], parts[4], parts[5], parts[6], tokens)
+
+    # Format JTDX: date dB DT Hz ~ message
+    if len(parts) >= 6 and parts[4] in jtdx_mode_markers:
+        tokens = []
+        for part in parts[5:]:
+            if jtdx_flags_pattern.match(part):
+                break
+            tokens.append(part)
+        return DecodeRecord(line, log_time_str, log_time, 'Rx', jtdx_mode_markers[parts[4]], parts[1], parts[2], parts[3], tokens)
+
+    # Emission JTDX: date Transmitting fréquence MHz mode: message
+    if len(parts) >= 2 and parts[1] == 'Transmitting':
+        for index, part in enumerate(parts):
+            if part.endswith(':'):
+                return DecodeRecord(line, log_time_str, log_time, 'Tx', part[:-1], None, None, None, parts[index + 1:])
+
+    # Autres formats: dB DT Hz suivis du message
+    match = wsjt_decode_pattern.search(line)
+    if match:
+        return DecodeRecord(line, log_time_str, log_time, 'Rx', None, match.group(1), match.group(2), match.group(3), match.group(4).split())
+
+    return DecodeRecord(line, log_time_str, log_time, None, None, None, None, None, parts[1:])
+
+class SlotDeduplicator:
+    # Un seul décodage par (séquence, message, fréquence audio): les passes successives
+    # du décodeur, AP et deep search, répètent les messages déjà décodés
+    def __init__(self, slot_count=dedupe_slot_count):
+        self.slot_count = slot_count
+        self.slots = {}
+        self.duplicates = 0
+
+    def is_duplicate(self, record):
+        keys = self.slots.get(record.log_time_str)
+        if keys is None:
+            keys = set()
+            self.slots[record.log_time_str] = keys
+            if len(self.slots) > self.slot_count:
+                # Oubli de la plus ancienne séquence
+                del self.slots[next(iter(self.slots))]
+
+        key = (record.message, record.hz)
+        if key in keys:
+            self.duplicates += 1
+            return True
+        keys.add(key)
+        return False
+
+class DecodeRingBuffer:
+    # Tampon circulaire de taille fixe des derniers décodages
+    def __init__(self, capacity=default_ring_buffer_capacity, deduplicator=None):
+        self.capacity = capacity
+        self.deduplicator = deduplicator
+        self.records = [None] * capacity
+        self.next_index = 0
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, record):
+        self.records[self.next_index] = record
+        self.next_index = (self.next_index + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def extend_lines(self, lines):
+        new_records = []
+        for line in lines:
+            record = parse_decode_line(line)
+            if record is not None:
+                if self.deduplicator is not None and self.deduplicator.is_duplicate(record):
+                    continue
+                self.append(record)
+                new_records.append(record)
+        return new_records
+
+    def extend_records(self, records):
+        # Décodages déjà analysés, par exemple reçus par UDP
+        new_records = []
+        for record in records:
+            if self.deduplicator is not None and self.deduplicator.is_duplicate(record):
+                continue
+            self.append(record)
+            new_records.append(record)
+        return new_records
+
+    def clear(self):
+        self.records = [None] * self.capacity
+        self.next_index = 0
+        self.count = 0
+
+    def latest(self, number_of_records=None):
+        # Décodages du plus récent au plus ancien
+        if number_of_records is None or number_of_records > self.count:
+            number_of_records = self.count
+
+        latest_records = []
+        index = self.next_index
+        for _ in range(number_of_records):
+            index = (index - 1) % self.capacity
+            latest_records.append(self.records[index])
+        return latest_records
@@ -0,0 +1,231 @@
+import os
+import sys
+import errno
+import select
+import struct
+
+from clock_service import get_clock
+
+# Intervalle de scrutation pour le mode polling
+default_poll_interval = 0.3
+
+class PollingFileWatcher:
+    # Mode de secours: comparaison périodique de la date et de la taille du fichier
+    def __init__(self, file_path, poll_interval=default_poll_interval):
+        self.file_path = file_path
+        self.poll_interval = poll_interval
+        self.last_state = self.get_state()
+
+    def get_state(self):
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def wait(self, timeout):
+        clock = get_clock()
+        deadline = clock.monotonic() + timeout
+
+        while True:
+            state = self.get_state()
+            if state != self.last_state:
+                self.last_state = state
+                return True
+
+            remaining = deadline - clock.monotonic()
+            if remaining <= 0:
+                return False
+            clock.sleep(min(self.poll_interval, remaining))
+
+    def close(self):
+        pass
+
+class InotifyFileWatcher:
+    # Linux: le noyau réveille le processus dès que le fichier est modifié
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+
+    event_header = struct.Struct('iIII')
+
+    def __init__(self, file_path):
+        import ctypes
+        import ctypes.util
+
+        self.file_path = file_path
+        self.directory = os.path.dirname(os.path.abspath(file_path))
+        self.file_name = os.path.basename(file_path)
+
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+
+        # Surveillance du répertoire afin de suivre aussi les fichiers recréés
+        mask = self.IN_MODIFY | self.IN_CLOSE_WRITE | self.IN_MOVED_TO | self.IN_CREATE | self.IN_DELETE
+        watch_descriptor = self.libc.inotify_add_watch(self.fd, os.fsencode(self.directory), mask)
+        if watch_descriptor < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, "inotify_add_watch")
+
+    def read_events(self):
+        file_names = []
+
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK):
+                    break
+                raise
+            if not data:
+                break
+
+            offset = 0
+            while offset + self.event_header.size <= len(data):
+                _, _, _, name_length = self.event_header.unpack_from(data, offset)
+                offset += self.event_header.size
+                name = data[offset:offset + name_length].rstrip(b'\0')
+                offset += name_length
+                file_names.append(os.fsdecode(name))
+
+        return file_names
+
+    def is_relevant(self, file_name):
+        return file_name == self.file_name
+
+    def wait(self, timeout):
+        clock = get_clock()
+        deadline = clock.monotonic() + timeout
+
+        while True:
+            remaining = deadline - clock.monotonic()
+            if remaining <= 0:
+                return False
+
+            readable, _, _ = select.select([self.fd], [], [], remaining)
+            if not readable:
+                return False
+
+            if any(self.is_relevant(file_name) for file_name in self.read_events()):
+                return True
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+class KqueueFileWatcher:
+    # macOS / BSD: notification kqueue sur le descripteur du fichier
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.kqueue = select.kqueue()
+        self.fd = None
+        self.open_file()
+
+    def open_file(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+        try:
+            self.fd = os.open(self.file_path, os.O_RDONLY)
+        except OSError:
+            return False
+
+        flags = select.KQ_NOTE_WRITE | select.KQ_NOTE_EXTEND | select.KQ_NOTE_DELETE | select.KQ_NOTE_RENAME
+        event = select.kevent(
+            self.fd,
+            filter=select.KQ_FILTER_VNODE,
+            flags=select.KQ_EV_ADD | select.KQ_EV_CLEAR,
+            fflags=flags
+        )
+        self.kqueue.control([event], 0, 0)
+        return True
+
+    def wait(self, timeout):
+        if self.fd is None:
+            # Fichier absent: on attend qu'il soit recréé
+            get_clock().sleep(timeout)
+            return self.open_file()
+
+        events = self.kqueue.control(None, 1, timeout)
+        if not events:
+            return False
+
+        if events[0].fflags & (select.KQ_NOTE_DELETE | select.KQ_NOTE_RENAME):
+            self.open_file()
+        return True
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        self.kqueue.close()
+
+class WindowsFileWatcher:
+    # Windows: notification de changement sur le répertoire du fichier
+    def __init__(self, file_path):
+        import win32file
+        import win32event
+        import win32con
+
+        self.win32file = win32file
+        self.win32event = win32event
+        self.file_path = file_path
+        self.directory = os.path.dirname(os.path.abspath(file_path))
+        self.last_state = self.get_state()
+        self.handle = win32file.FindFirstChangeNotification(
+            self.directory,
+            False,
+            win32con.FILE_NOTIFY_CHANGE_LAST_WRITE | win32con.FILE_NOTIFY_CHANGE_SIZE | win32con.FILE_NOTIFY_CHANGE_FILE_NAME
+        )
+
+    def get_state(self):
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def wait(self, timeout):
+        clock = get_clock()
+        deadline = clock.monotonic() + timeout
+
+        while True:
+            remaining = deadline - clock.monotonic()
+            if remaining <= 0:
+                return False
+
+            result = self.win32event.WaitForSingleObject(self.handle, int(remaining * 1000))
+            if result != self.win32event.WAIT_OBJECT_0:
+                return False
+            self.win32file.FindNextChangeNotification(self.handle)
+
+            # La notification concerne tout le répertoire
+            state = self.get_state()
+            if state != self.last_state:
+                self.last_state = state
+                return True
+
+    def close(self):
+        if self.handle is not None:
+            self.win32file.FindCloseChangeNotification(self.handle)
+            self.handle = None
+
+def create_file_watcher(file_path, poll_interval=default_poll_interval):
+    try:
+        if sys.platform.startswith('linux'):
+            return InotifyFileWatcher(file_path)
+        elif sys.platform == 'win32':
+            return WindowsFileWatcher(file_path)
+        elif hasattr(select, 'kqueue'):
+            return KqueueFileWatcher(file_path)
+    except (ImportError, OSError) as e:
+        print(f"Surveillance native du fichier indisponible ({e}), passage en mode polling")
+
+    return PollingFileWatcher(file_path, poll_interval)
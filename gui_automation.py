@@ -0,0 +1,78 @@
+# Backends d'automatisation de l'interface de JTDX / WSJT-X: fenêtres, lecture
+# des pixels, clics, saisie au clavier et presse-papier. Les modules Windows
+# ne sont importés qu'à la création du backend, le moteur se charge sous Linux
+
+class AutomationError(Exception):
+    pass
+
+class DesktopAutomation:
+    # Souris, clavier et fenêtres du bureau Windows (pyautogui, pygetwindow, pywin32)
+    def __init__(self):
+        # Imports explicites, détectés par PyInstaller
+        import pyautogui
+        import pyperclip
+        import pygetwindow
+        import win32gui
+        import win32con
+
+        self.pyautogui = pyautogui
+        self.pyperclip = pyperclip
+        self.gw = pygetwindow
+        self.win32gui = win32gui
+        self.win32con = win32con
+
+    def find_window(self, window_title):
+        windows = self.gw.getWindowsWithTitle(window_title)
+        if not windows:
+            return None
+        return windows[0]
+
+    def is_foreground(self, window):
+        return window._hWnd == self.win32gui.GetForegroundWindow()
+
+    def restore_window(self, window):
+        window.restore()
+
+    def raise_window(self, window):
+        # Remettre la fenêtre en place quelque soit son état
+        win32gui = self.win32gui
+        win32con = self.win32con
+        real_window = window._hWnd
+        win32gui.ShowWindow(real_window, win32con.SW_RESTORE)
+        win32gui.SetWindowPos(real_window, win32con.HWND_TOPMOST, 0, 0, 0, 0,
+                              win32con.SWP_NOMOVE | win32con.SWP_NOSIZE)
+        win32gui.SetWindowPos(real_window, win32con.HWND_NOTOPMOST, 0, 0, 0, 0,
+                              win32con.SWP_NOMOVE | win32con.SWP_NOSIZE)
+        win32gui.SetForegroundWindow(real_window)
+        win32gui.BringWindowToTop(real_window)
+
+    def move_window(self, window, x, y, width, height):
+        window.moveTo(x, y)
+        window.resizeTo(width, height)
+
+    def move_to(self, x, y):
+        self.pyautogui.moveTo(x, y)
+
+    def pixel(self, x, y):
+        try:
+            return self.pyautogui.pixel(x, y)
+        except self.pyautogui.PyAutoGUIException as e:
+            raise AutomationError(e)
+
+    def click(self, x, y, button='left'):
+        try:
+            self.pyautogui.click(x, y, button=button)
+        except self.pyautogui.PyAutoGUIException as e:
+            raise AutomationError(e)
+
+    def hotkey(self, *keys):
+        self.pyautogui.hotkey(*keys)
+
+    def press(self, key):
+        self.pyautogui.press(key)
+
+    def typewrite(self, text):
+        self.pyautogui.typewrite(text)
+
+    def paste(self):
+        return self.pyperclip.paste()
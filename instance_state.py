@@ -0,0 +1,88 @@
+from clock_service import get_clock
+from slot_clock import period_at
+
+# L'instance envoie un Heartbeat toutes les 15 secondes: sans aucun message
+# pendant ce délai, l'état reflété n'est plus considéré comme fiable
+max_state_age = 60
+
+class InstanceState:
+    # Reflet de l'état de l'instance tenu à jour par les messages UDP Status:
+    # lecture immédiate, sans activation de fenêtre ni capture d'écran.
+    # Le Status ne transmet pas la période d'émission: elle est déduite
+    # de l'heure de début de chaque émission
+    __slots__ = (
+        'tx_enabled',
+        'transmitting',
+        'tx_period',
+        'dx_call',
+        'dial_frequency',
+        'mode',
+        'decoding',
+        'tx_watchdog',
+        'status_count',
+        'last_seen',
+        'closed',
+        'clock'
+    )
+
+    def __init__(self, clock=None):
+        self.tx_enabled = False
+        self.transmitting = False
+        self.tx_period = None
+        self.dx_call = None
+        self.dial_frequency = None
+        self.mode = None
+        self.decoding = False
+        self.tx_watchdog = False
+        self.status_count = 0
+        self.last_seen = None
+        self.closed = False
+        self.clock = clock if clock is not None else get_clock()
+
+    def on_packet(self):
+        self.last_seen = self.clock.monotonic()
+        self.closed = False
+
+    def on_status(self, status, now=None):
+        if now is None:
+            now = self.clock.now()
+
+        # Début d'émission: la séquence en cours donne la période d'émission
+        if status.transmitting and not self.transmitting:
+            self.tx_period = period_at(now)
+
+        self.tx_enabled = status.tx_enabled
+        self.transmitting = status.transmitting
+        self.dx_call = status.dx_call
+        self.dial_frequency = status.dial_frequency
+        self.mode = status.mode
+        self.decoding = status.decoding
+        self.tx_watchdog = status.tx_watchdog
+        self.status_count += 1
+        self.last_seen = self.clock.monotonic()
+
+    def on_close(self):
+        self.closed = True
+
+    def set_tx_period(self, period):
+        # Période choisie par un clic, en attendant la prochaine émission
+        self.tx_period = period
+
+    def is_known(self):
+        if self.status_count == 0 or self.closed:
+            return False
+        return self.clock.monotonic() - self.last_seen < max_state_age
+
+    def known_tx_period(self):
+        if self.is_known():
+            return self.tx_period
+        return None
+
+    def is_tx_enabled_for(self, callsign):
+        return self.is_known() and self.tx_enabled and self.dx_call == callsign
+
+    def __repr__(self):
+        return (
+            f"InstanceState(tx_enabled={self.tx_enabled}, transmitting={self.transmitting}, "
+            f"tx_period={self.tx_period}, dx_call={self.dx_call!r}, dial_frequency={self.dial_frequency})"
+        )
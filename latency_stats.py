@@ -0,0 +1,163 @@
+import json
+import math
+import threading
+
+from clock_service import get_clock
+
+# Etapes mesurées entre l'écriture d'un décodage et l'action sur l'instance
+STAGE_LINE_APPENDED = "line_appended"
+STAGE_LINE_PARSED = "line_parsed"
+STAGE_CANDIDATE_MATCHED = "candidate_matched"
+STAGE_DECISION_MADE = "decision_made"
+STAGE_ACTION_STARTED = "action_started"
+STAGE_ACTION_CONFIRMED = "action_confirmed"
+
+stages = [
+    STAGE_LINE_APPENDED,
+    STAGE_LINE_PARSED,
+    STAGE_CANDIDATE_MATCHED,
+    STAGE_DECISION_MADE,
+    STAGE_ACTION_STARTED,
+    STAGE_ACTION_CONFIRMED,
+]
+
+# Durée totale, du décodage écrit à l'action confirmée
+TOTAL = "total"
+
+# Histogramme logarithmique: 20 classes par décade, de 1 µs à 1000 s
+buckets_per_decade = 20
+min_latency = 1e-6
+bucket_count = 9 * buckets_per_decade + 1
+
+percentiles = (50, 95, 99)
+
+class LatencyHistogram:
+    __slots__ = ('counts', 'count', 'total', 'minimum', 'maximum')
+
+    def __init__(self):
+        self.counts = [0] * bucket_count
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+
+    def add(self, latency):
+        if latency < 0:
+            # Horloges différentes (date de modification du fichier): valeur ramenée à zéro
+            latency = 0.0
+
+        if latency <= min_latency:
+            index = 0
+        else:
+            index = min(bucket_count - 1, int(math.log10(latency / min_latency) * buckets_per_decade) + 1)
+
+        self.counts[index] += 1
+        self.count += 1
+        self.total += latency
+        if self.minimum is None or latency < self.minimum:
+            self.minimum = latency
+        if self.maximum is None or latency > self.maximum:
+            self.maximum = latency
+
+    def percentile(self, percent):
+        if self.count == 0:
+            return None
+
+        rank = math.ceil(self.count * percent / 100)
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                # Borne supérieure de la classe, sans dépasser le maximum observé
+                upper = min_latency * 10 ** (index / buckets_per_decade)
+                return min(max(upper, self.minimum), self.maximum)
+        return self.maximum
+
+    def summary(self):
+        values = {
+            'count': self.count,
+            'min': self.minimum,
+            'max': self.maximum,
+            'mean': self.total / self.count if self.count else None,
+        }
+        for percent in percentiles:
+            values[f"p{percent}"] = self.percentile(percent)
+        return values
+
+class LatencyTrace:
+    # Horodatage des étapes d'une analyse, transmis avec l'intention ENABLE_TX
+    __slots__ = ('tracker', 'timestamps', 'asynchronous')
+
+    def __init__(self, tracker, appended_time):
+        self.tracker = tracker
+        self.timestamps = {STAGE_LINE_APPENDED: appended_time}
+        # Action exécutée par un autre thread, qui termine la mesure
+        self.asynchronous = False
+
+    def mark(self, stage, timestamp=None):
+        self.timestamps[stage] = timestamp if timestamp is not None else self.tracker.clock()
+
+    def finish(self):
+        self.tracker.record(self)
+
+def current_time():
+    return get_clock().time()
+
+class LatencyTracker:
+    # Histogrammes par étape (durée depuis l'étape précédente) et de bout en bout
+    def __init__(self, clock=None):
+        # Horloge commune par défaut, y compris une horloge installée après la création
+        self.clock = clock if clock is not None else current_time
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.histograms = {stage: LatencyHistogram() for stage in stages[1:]}
+        self.histograms[TOTAL] = LatencyHistogram()
+        self.started_at = self.clock()
+
+    def start(self, appended_time=None):
+        return LatencyTrace(self, appended_time if appended_time is not None else self.clock())
+
+    def record(self, trace):
+        timestamps = trace.timestamps
+        with self.lock:
+            previous = timestamps[STAGE_LINE_APPENDED]
+            for stage in stages[1:]:
+                timestamp = timestamps.get(stage)
+                if timestamp is None:
+                    continue
+                self.histograms[stage].add(timestamp - previous)
+                previous = timestamp
+
+            if STAGE_ACTION_CONFIRMED in timestamps:
+                self.histograms[TOTAL].add(timestamps[STAGE_ACTION_CONFIRMED] - timestamps[STAGE_LINE_APPENDED])
+
+    def summary(self):
+        with self.lock:
+            return {name: histogram.summary() for name, histogram in self.histograms.items()}
+
+    def report(self):
+        lines = [f"{'Etape':<18} {'n':>6} {'p50':>10} {'p95':>10} {'p99':>10} {'max':>10}"]
+        for name, values in self.summary().items():
+            columns = [format_latency(values[key]) for key in ('p50', 'p95', 'p99', 'max')]
+            lines.append(f"{name:<18} {values['count']:>6} {columns[0]:>10} {columns[1]:>10} {columns[2]:>10} {columns[3]:>10}")
+        return "\n".join(lines)
+
+    def dump(self, file_path):
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump({
+                'started_at': self.started_at,
+                'dumped_at': self.clock(),
+                'unit': 'seconds',
+                'stages': self.summary(),
+            }, file, indent=2)
+
+def format_latency(latency):
+    if latency is None:
+        return "-"
+    if latency < 1e-3:
+        return f"{latency * 1e6:.0f} µs"
+    if latency < 1:
+        return f"{latency * 1e3:.1f} ms"
+    return f"{latency:.2f} s"
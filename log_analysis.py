@@ -0,0 +1,289 @@
+import re
+import datetime
+import functools
+import traceback
+
+from clock_service import get_clock
+from message_classifier import classify_sequence
+
+utc = datetime.timezone.utc
+
+EVEN = "EVEN"
+ODD = "ODD"
+
+def ends_with_even_or_odd(log_time_str):
+    if log_time_str[-1].isdigit():
+        last_digit = int(log_time_str[-1])
+        if last_digit % 2 == 0:
+            # Nombres paires
+            # (first)
+            return EVEN
+        else:
+            # Nombre impaires
+            # (second)
+            return ODD
+    else:
+        return False
+
+# Séquences à identifier
+def build_sequences(your_callsign, call_selected):
+    # Definition des séquences à identifier:
+    # Attention, l'ordre doit être respecté par ordre décroissant d'importance des messages
+    return {
+        'report_received_73_for_my_call': f"{your_callsign} {call_selected} RR73",
+        'best_regards_received_for_my_call': f"{your_callsign} {call_selected} 73",
+        'best_regards_sent_to_call_selected': f"{call_selected} {your_callsign} 73",
+        'best_regards': f"{call_selected} 73",
+        'reply_to_my_call': f"{your_callsign} {call_selected}",
+        'reception_report_received': f"{call_selected} RRR",
+        'report_received_73': f"{call_selected} RR73",
+        'cq_call_selected': f"CQ {call_selected}",
+        'respond_with_positive_signal_report': f"{call_selected} +",
+        'respond_with_negative_signal_report': f"{call_selected} -",
+        'confirm_signal_and_respond_with_positive_signal_report': f"{call_selected} R+",
+        'confirm_signal_and_respond_with_negative_signal_report': f"{call_selected} R-"
+    }
+
+# Dernier horodatage analysé: toutes les lignes d'une même séquence FT8 le partagent
+# Un seul tuple remplacé en une affectation, lisible depuis plusieurs instances
+last_log_time_cache = (None, None)
+
+def parse_two_digits(text, start):
+    return (ord(text[start]) - 48) * 10 + ord(text[start + 1]) - 48
+
+def get_log_time(log_time_str):
+    global last_log_time_cache
+
+    cached_log_time_str, cached_log_time = last_log_time_cache
+    if log_time_str == cached_log_time_str:
+        return cached_log_time
+
+    log_time = None
+
+    try:
+        # Format JTDX: YYYYMMDD_HHMMSS
+        if len(log_time_str) >= 15 and log_time_str[8] == '_' and log_time_str[:8].isdigit() and log_time_str[9:15].isdigit():
+            log_time = datetime.datetime(
+                parse_two_digits(log_time_str, 0) * 100 + parse_two_digits(log_time_str, 2),
+                parse_two_digits(log_time_str, 4),
+                parse_two_digits(log_time_str, 6),
+                parse_two_digits(log_time_str, 9),
+                parse_two_digits(log_time_str, 11),
+                parse_two_digits(log_time_str, 13),
+                tzinfo=utc
+            )
+        # Format WSJT: YYMMDD_HHMMSS
+        elif len(log_time_str) >= 13 and log_time_str[6] == '_' and log_time_str[:6].isdigit() and log_time_str[7:13].isdigit():
+            if len(log_time_str) != 13:
+                raise ValueError(f"unconverted data remains: {log_time_str[13:]}")
+            year = parse_two_digits(log_time_str, 0)
+            log_time = datetime.datetime(
+                year + (2000 if year < 69 else 1900),
+                parse_two_digits(log_time_str, 2),
+                parse_two_digits(log_time_str, 4),
+                parse_two_digits(log_time_str, 7),
+                parse_two_digits(log_time_str, 9),
+                parse_two_digits(log_time_str, 11),
+                tzinfo=utc
+            )
+    except Exception as e:
+        print(f"Problème de formattage: {log_time_str}")
+
+    last_log_time_cache = (log_time_str, log_time)
+
+    return log_time
+
+def contains_wildcard(callsign):
+    if "*" in callsign or "@" in callsign:
+        return True
+    else:
+        return False
+
+# Un wildcard ('*' ou '@') remplace une suite de caractères d'indicatif
+wildcard_split_pattern = re.compile(r'[\*@]')
+
+def wildcard_to_regex(wanted_callsign):
+    return r"[\w/]+".join(re.escape(part) for part in wildcard_split_pattern.split(wanted_callsign))
+
+class WildcardMatcher:
+    # Tous les indicatifs avec wildcard sont réunis dans une seule expression:
+    # préfixe (3Y*), suffixe (*/P) ou infixe (F*UKW)
+    def __init__(self, wanted_callsigns_list):
+        self.wanted_callsigns = []
+        alternatives = []
+
+        for index, wanted_callsign in enumerate(wanted_callsigns_list):
+            if contains_wildcard(wanted_callsign):
+                alternatives.append(f"(?P<w{len(self.wanted_callsigns)}>{wildcard_to_regex(wanted_callsign)})")
+                self.wanted_callsigns.append((index, wanted_callsign))
+
+        if alternatives:
+            self.pattern = re.compile("|".join(alternatives))
+        else:
+            self.pattern = None
+
+    def match_callsign(self, callsign):
+        # Retourne (position dans la liste, indicatif wildcard) ou None
+        if self.pattern is None:
+            return None
+        match = self.pattern.fullmatch(callsign)
+        if match is None:
+            return None
+        return self.wanted_callsigns[int(match.lastgroup[1:])]
+
+    def find_callsigns(self, text):
+        found = []
+        for token in text.split():
+            callsign = token.strip("<>")
+            wanted = self.match_callsign(callsign)
+            if wanted is not None:
+                found.append((wanted[0], wanted[1], callsign))
+        return found
+
+@functools.lru_cache(maxsize=32)
+def compile_wildcard_matcher(wanted_callsigns):
+    # Compilation unique par liste d'indicatifs recherchés
+    return WildcardMatcher(wanted_callsigns)
+
+@functools.lru_cache(maxsize=256)
+def compile_sequence_pattern(search_with_wildcard):
+    words = []
+    for word in search_with_wildcard.split(" "):
+        if contains_wildcard(word):
+            words.append(f"({wildcard_to_regex(word)})")
+        else:
+            words.append(re.escape(word))
+    return re.compile(r'(?:^|\s)' + r"\s+".join(words) + r'(?![\w/])')
+
+def extract_callsign(line, search_with_wildcard):
+    if not contains_wildcard(search_with_wildcard):
+        return None
+
+    match = compile_sequence_pattern(search_with_wildcard).search(line)
+    if match:
+        return match.group(1)
+
+    return None
+
+def decode_sequence(sequence, instance_type):
+    # sequence peut être une ligne du log ou un DecodeRecord déjà analysé
+    if not isinstance(sequence, str):
+        if instance_type == "JTDX":
+            if sequence.db is not None:
+                return f"{sequence.db}dB {sequence.dt} {sequence.hz}Hz {sequence.message}"
+        elif sequence.message:
+            return sequence.message
+    elif instance_type == "JTDX":
+        match = re.match(r"(?P<timestamp>\d{8}_\d{6})\s+(?P<db>[+-]?\d+)\s+(?P<dt>[+-]?\d+\.\d+)\s+(?P<hz>\d{2,4})\s+~\s+(?P<message>.+?)(?=\s*[\*\^]|$)", sequence)
+        if match:
+            db = f"{match.group('db')}dB"
+            dt = match.group('dt')
+            hz = f"{match.group('hz')}Hz"
+            message = match.group('message').strip()
+            return f"{db} {dt} {hz} {message}"
+    else:
+        match = re.search(r"\s+([-+]?\d+)\s+([-+]?\d*\.\d+)\s+(\d{2,4})\s+(.+)", sequence)
+        if match:
+            return match.group(4)
+
+    print("Format de séquence avec problème")
+    return False
+
+class CallsignMatcher:
+    # Recherche de tous les indicatifs voulus en un seul passage sur les décodages:
+    # chaque indicatif du message est recherché dans une table des indicatifs,
+    # le type de séquence est ensuite déduit du message déjà classifié
+    def __init__(self, your_callsign, wanted_callsigns_list, excluded_callsigns_list=None):
+        self.your_callsign = your_callsign
+        self.excluded_callsigns_list = excluded_callsigns_list if excluded_callsigns_list is not None else []
+        self.sequences_cache = {}
+        self.set_wanted_callsigns(wanted_callsigns_list)
+
+    def set_wanted_callsigns(self, wanted_callsigns_list):
+        self.wanted_callsigns = {}
+
+        for index, wanted_callsign in enumerate(wanted_callsigns_list):
+            if not contains_wildcard(wanted_callsign) and wanted_callsign not in self.wanted_callsigns:
+                self.wanted_callsigns[wanted_callsign] = index
+
+        self.wildcard_matcher = compile_wildcard_matcher(tuple(wanted_callsigns_list))
+
+    def get_sequences(self, wanted_callsign):
+        sequences = self.sequences_cache.get(wanted_callsign)
+        if sequences is None:
+            sequences = build_sequences(self.your_callsign, wanted_callsign)
+            self.sequences_cache[wanted_callsign] = sequences
+        return sequences
+
+    def match_record(self, record):
+        hits = []
+        seen = set()
+
+        for message in record.messages:
+            for callsign in (message.call1, message.call2):
+                if callsign is None or callsign in seen:
+                    continue
+                seen.add(callsign)
+
+                index = self.wanted_callsigns.get(callsign)
+                wanted_callsign = callsign
+
+                # Un wildcard placé avant dans la liste reste prioritaire
+                wanted = self.wildcard_matcher.match_callsign(callsign)
+                if wanted is not None and callsign not in self.excluded_callsigns_list:
+                    if index is None or wanted[0] < index:
+                        index, wanted_callsign = wanted
+
+                if index is None:
+                    continue
+
+                sequence_type, ft8_message = classify_sequence(record.messages, self.your_callsign, callsign)
+                if sequence_type is not None:
+                    # La séquence retournée est celle de l'indicatif recherché
+                    sequence = self.get_sequences(wanted_callsign)[sequence_type]
+                    hits.append((index, wanted_callsign, callsign, sequence_type, sequence, ft8_message))
+
+        return hits
+
+    def find_candidates(self, records, last_monitor_time, time_max_expected_in_minutes=10, now=None):
+        # Les décodages doivent être fournis du plus récent au plus ancien
+        candidates = []
+        if now is None:
+            now = get_clock().now()
+
+        for record in records:
+            try:
+                # Calculer la différence de temps
+                time_difference_in_seconds = (now - record.log_time).total_seconds()
+
+                # Vérifier si la ligne est dans la limite de temps
+                if time_difference_in_seconds / 60.0 >= time_max_expected_in_minutes or record.log_time <= last_monitor_time:
+                    continue
+
+                for index, wanted_callsign, callsign, sequence_type, sequence, ft8_message in self.match_record(record):
+                    candidates.append({
+                        'index': index,
+                        'wanted_callsign': wanted_callsign,
+                        'callsign': callsign,
+                        'sequence_type': sequence_type,
+                        'sequence': sequence,
+                        'message_type': ft8_message,
+                        'message': record.line.strip(),
+                        'period': record.period,
+                        'record': record,
+                        'time_difference_in_seconds': time_difference_in_seconds
+                    })
+            except Exception as e:
+                timestamp = get_clock().now().astimezone().strftime("%y%m%d_%H%M%S")
+                print(f"{timestamp} Exception: {str(e)}\n")
+                print(f"{timestamp} Traceback:\n{traceback.format_exc()}\n")
+
+        return candidates
+
+    def select_candidate(self, candidates):
+        # Priorité à l'ordre de la liste des indicatifs voulus, puis à la ligne la plus récente
+        selected = None
+        for candidate in candidates:
+            if selected is None or candidate['index'] < selected['index']:
+                selected = candidate
+        return selected
@@ -0,0 +1,248 @@
+import os
+import glob
+import mmap
+import collections
+
+from clock_service import get_clock
+
+# Nombre de lignes conservées par défaut pour l'analyse
+default_max_lines = 100
+
+# Taille des blocs lus en partant de la fin du fichier
+default_block_size = 64 * 1024
+
+# Intervalle (s) de comparaison des dates des fichiers de log, même sans changement du répertoire:
+# le nouveau fichier peut être créé avant sa première écriture
+rollover_check_interval = 5
+
+def find_last_lines_span_with_seek(file, file_size, number_of_lines, block_size=default_block_size):
+    # Lecture du fichier par blocs en remontant depuis la fin.
+    # Retourne (début, fin) des number_of_lines dernières lignes complètes
+    end = None
+    newlines_found = 0
+    position = file_size
+
+    while position > 0:
+        read_size = min(block_size, position)
+        position -= read_size
+        file.seek(position)
+        block = file.read(read_size)
+        index = len(block)
+
+        while True:
+            index = block.rfind(b'\n', 0, index)
+            if index < 0:
+                break
+            if end is None:
+                # Fin de la dernière ligne complète
+                end = position + index + 1
+                if number_of_lines <= 0:
+                    return end, end
+            else:
+                newlines_found += 1
+                if newlines_found == number_of_lines:
+                    return position + index + 1, end
+
+    if end is None:
+        return 0, 0
+    return 0, end
+
+def find_last_lines_span_with_mmap(file, file_size, number_of_lines):
+    if file_size == 0:
+        return 0, 0
+
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        end = view.rfind(b'\n') + 1
+        if end == 0:
+            return 0, 0
+
+        start = end - 1
+        for _ in range(number_of_lines):
+            start = view.rfind(b'\n', 0, start)
+            if start < 0:
+                return 0, end
+        return start + 1, end
+
+def read_last_lines_with_offset(file_path, number_of_lines, encoding='utf-8', use_mmap=False):
+    # Une éventuelle dernière ligne incomplète (en cours d'écriture) est ignorée,
+    # l'offset retourné pointe sur son début
+    with open(file_path, 'rb') as file:
+        file_size = os.fstat(file.fileno()).st_size
+
+        span = None
+        if use_mmap:
+            try:
+                span = find_last_lines_span_with_mmap(file, file_size, number_of_lines)
+            except (OSError, ValueError):
+                span = None
+        if span is None:
+            span = find_last_lines_span_with_seek(file, file_size, number_of_lines)
+
+        start, end = span
+        file.seek(start)
+        data = file.read(end - start)
+
+    lines = [chunk.decode(encoding, errors='replace').rstrip('\r') for chunk in data.split(b'\n')[:-1]]
+    return lines, end
+
+def read_last_lines(file_path, number_of_lines, encoding='utf-8', use_mmap=False):
+    lines, _ = read_last_lines_with_offset(file_path, number_of_lines, encoding, use_mmap)
+    return lines
+
+class LogTailReader:
+    def __init__(self, file_path, max_lines=default_max_lines, encoding='utf-8', start_at_end=True):
+        self.file_path = file_path
+        self.encoding = encoding
+        self.offset = 0
+        self.partial = b''
+        self.file_id = None
+        self.recent_lines = collections.deque(maxlen=max_lines)
+
+        if start_at_end:
+            self.prime()
+
+    def get_file_id(self, stat):
+        return (stat.st_dev, stat.st_ino)
+
+    def prime(self, number_of_lines=None):
+        # Chargement des dernières lignes sans lire tout le fichier
+        if number_of_lines is None:
+            number_of_lines = self.recent_lines.maxlen
+        try:
+            stat = os.stat(self.file_path)
+            lines, end = read_last_lines_with_offset(self.file_path, number_of_lines, self.encoding)
+        except OSError:
+            return
+        self.file_id = self.get_file_id(stat)
+        self.offset = end
+        self.partial = b''
+        self.recent_lines.clear()
+        self.recent_lines.extend(lines)
+
+    def reset(self, file_id=None):
+        self.file_id = file_id
+        self.offset = 0
+        self.partial = b''
+
+    def read_new_lines(self):
+        try:
+            stat = os.stat(self.file_path)
+        except OSError:
+            return []
+
+        file_id = self.get_file_id(stat)
+
+        # Fichier remplacé ou tronqué: on repart du début
+        if file_id != self.file_id or stat.st_size < self.offset:
+            self.reset(file_id)
+
+        if stat.st_size == self.offset:
+            return []
+
+        with open(self.file_path, 'rb') as file:
+            file.seek(self.offset)
+            data = file.read()
+
+        self.offset += len(data)
+
+        # La dernière ligne peut être incomplète si le logiciel est en cours d'écriture
+        chunks = (self.partial + data).split(b'\n')
+        self.partial = chunks.pop()
+
+        new_lines = [chunk.decode(self.encoding, errors='replace').rstrip('\r') for chunk in chunks]
+        self.recent_lines.extend(new_lines)
+
+        return new_lines
+
+    def last_lines(self, number_of_lines=None):
+        lines = list(self.recent_lines)
+        if number_of_lines is None:
+            return lines
+        return lines[-number_of_lines:]
+
+class LogFileFollower:
+    # Suivi d'un répertoire de logs: JTDX crée un nouveau fichier YYYYMM_ALL.TXT chaque mois
+    def __init__(self, dir_path, pattern="*ALL.TXT", file_path=None, max_lines=default_max_lines, encoding='utf-8'):
+        self.dir_path = dir_path
+        self.pattern = pattern
+        self.encoding = encoding
+        self.dir_mtime = None
+        self.candidates = []
+        self.pending_lines = []
+        self.last_rollover_check = None
+
+        self.refresh_candidates()
+        if file_path is None:
+            file_path = self.latest_candidate()
+
+        self.reader = LogTailReader(file_path, max_lines, encoding)
+
+    @property
+    def file_path(self):
+        return self.reader.file_path
+
+    @property
+    def recent_lines(self):
+        return self.reader.recent_lines
+
+    def refresh_candidates(self):
+        # La liste des fichiers n'est relue que si le contenu du répertoire a changé
+        try:
+            dir_mtime = os.stat(self.dir_path).st_mtime_ns
+        except OSError:
+            return False
+
+        if dir_mtime == self.dir_mtime:
+            return False
+
+        self.dir_mtime = dir_mtime
+        self.candidates = glob.glob(os.path.join(self.dir_path, self.pattern))
+        return True
+
+    def latest_candidate(self):
+        latest_file = None
+        latest_mtime = None
+
+        for candidate in self.candidates:
+            try:
+                mtime = os.path.getmtime(candidate)
+            except OSError:
+                continue
+            if latest_mtime is None or mtime > latest_mtime:
+                latest_file = candidate
+                latest_mtime = mtime
+
+        return latest_file
+
+    def check_rollover(self):
+        # Les écritures dans un fichier existant ne modifient pas la date du répertoire
+        refreshed = self.refresh_candidates()
+        now = get_clock().monotonic()
+        if not refreshed and self.last_rollover_check is not None and now - self.last_rollover_check < rollover_check_interval:
+            return False
+        self.last_rollover_check = now
+
+        latest_file = self.latest_candidate()
+        if latest_file is None or os.path.normcase(latest_file) == os.path.normcase(self.file_path):
+            return False
+
+        # Lecture des dernières lignes de l'ancien fichier avant de basculer
+        self.pending_lines.extend(self.reader.read_new_lines())
+
+        # Le nouveau fichier est lu depuis son début, la fenêtre de lignes est conservée
+        new_reader = LogTailReader(latest_file, self.reader.recent_lines.maxlen, self.encoding, start_at_end=False)
+        new_reader.recent_lines = self.reader.recent_lines
+        self.reader = new_reader
+
+        return True
+
+    def read_new_lines(self):
+        self.check_rollover()
+
+        new_lines = self.pending_lines + self.reader.read_new_lines()
+        self.pending_lines = []
+
+        return new_lines
+
+    def last_lines(self, number_of_lines=None):
+        return self.reader.last_lines(number_of_lines)
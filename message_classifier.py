@@ -0,0 +1,178 @@
+import re
+
+# Types de messages FT8
+MESSAGE_CQ = "CQ"
+MESSAGE_CALLS = "CALLS"
+MESSAGE_GRID = "GRID"
+MESSAGE_REPORT = "REPORT"
+MESSAGE_ROGER_REPORT = "ROGER_REPORT"
+MESSAGE_RRR = "RRR"
+MESSAGE_RR73 = "RR73"
+MESSAGE_73 = "73"
+MESSAGE_TEXT = "TEXT"
+
+acknowledgements = {
+    'RRR': MESSAGE_RRR,
+    'RR73': MESSAGE_RR73,
+    '73': MESSAGE_73,
+}
+
+grid_pattern = re.compile(r'^[A-R]{2}[0-9]{2}$')
+report_pattern = re.compile(r'^[+-][0-9]{2}$')
+roger_report_pattern = re.compile(r'^R[+-][0-9]{2}$')
+
+# Ordre de priorité des séquences, identique à build_sequences
+sequence_priority = {
+    'report_received_73_for_my_call': 0,
+    'best_regards_received_for_my_call': 1,
+    'best_regards_sent_to_call_selected': 2,
+    'best_regards': 3,
+    'reply_to_my_call': 4,
+    'reception_report_received': 5,
+    'report_received_73': 6,
+    'cq_call_selected': 7,
+    'respond_with_positive_signal_report': 8,
+    'respond_with_negative_signal_report': 9,
+    'confirm_signal_and_respond_with_positive_signal_report': 10,
+    'confirm_signal_and_respond_with_negative_signal_report': 11,
+}
+
+class FT8Message:
+    __slots__ = ('message_type', 'call1', 'call2', 'grid', 'report')
+
+    def __init__(self, message_type, call1=None, call2=None, grid=None, report=None):
+        self.message_type = message_type
+        self.call1 = call1
+        self.call2 = call2
+        self.grid = grid
+        self.report = report
+
+    def __repr__(self):
+        return f"FT8Message({self.message_type}, {self.call1}, {self.call2}, grid={self.grid}, report={self.report})"
+
+def strip_hash(callsign):
+    # Indicatif haché affiché entre <...>
+    return callsign.strip("<>")
+
+def is_cq_modifier(token):
+    # CQ DX, CQ NA, CQ POTA, CQ 123...
+    return (token.isalpha() and len(token) <= 4) or token.isdigit()
+
+def classify_answer(call1, call2, word):
+    if word in acknowledgements:
+        return FT8Message(acknowledgements[word], call1, call2)
+    if report_pattern.match(word):
+        return FT8Message(MESSAGE_REPORT, call1, call2, report=word)
+    if roger_report_pattern.match(word):
+        return FT8Message(MESSAGE_ROGER_REPORT, call1, call2, report=word[1:])
+    if grid_pattern.match(word):
+        return FT8Message(MESSAGE_GRID, call1, call2, grid=word)
+    return FT8Message(MESSAGE_TEXT, call1, call2)
+
+def classify_part(tokens):
+    if not tokens:
+        return None
+
+    if tokens[0] == "CQ":
+        if len(tokens) >= 3 and is_cq_modifier(tokens[1]):
+            tokens = tokens[2:]
+        else:
+            tokens = tokens[1:]
+        if not tokens:
+            return FT8Message(MESSAGE_TEXT)
+        grid = tokens[1] if len(tokens) > 1 and grid_pattern.match(tokens[1]) and tokens[1] != 'RR73' else None
+        return FT8Message(MESSAGE_CQ, "CQ", strip_hash(tokens[0]), grid=grid)
+
+    if len(tokens) < 2:
+        return FT8Message(MESSAGE_TEXT, strip_hash(tokens[0]))
+
+    if len(tokens) == 2:
+        return FT8Message(MESSAGE_CALLS, strip_hash(tokens[0]), strip_hash(tokens[1]))
+
+    return classify_answer(strip_hash(tokens[0]), strip_hash(tokens[1]), tokens[2])
+
+def classify_message(tokens):
+    # Un message Fox multi-stream contient plusieurs parties séparées par ';'
+    # ex: "K1ABC RR73; F5UKW <3Y0J> -12", l'indicatif du Fox n'apparaît qu'à la fin
+    parts = []
+    current = []
+    for token in tokens:
+        if token.endswith(';'):
+            current.append(token[:-1])
+            parts.append(current)
+            current = []
+        else:
+            current.append(token)
+    parts.append(current)
+
+    if len(parts) == 1:
+        message = classify_part(parts[0])
+        return [message] if message is not None else []
+
+    last_message = classify_part(parts[-1])
+    fox_callsign = last_message.call2 if last_message is not None else None
+
+    messages = []
+    for part in parts[:-1]:
+        if len(part) == 2:
+            messages.append(classify_answer(strip_hash(part[0]), fox_callsign, part[1]))
+        else:
+            message = classify_part(part)
+            if message is not None:
+                messages.append(message)
+
+    if last_message is not None:
+        messages.append(last_message)
+
+    return messages
+
+def get_sequence_type(message, your_callsign, callsign):
+    # Equivalent par mots des séquences de build_sequences, sans recherche de sous-chaînes
+    message_type = message.message_type
+
+    if message.call1 == your_callsign and message.call2 == callsign:
+        if message_type == MESSAGE_RR73:
+            return 'report_received_73_for_my_call'
+        if message_type == MESSAGE_73:
+            return 'best_regards_received_for_my_call'
+        return 'reply_to_my_call'
+
+    if message.call1 == callsign and message.call2 == your_callsign and message_type == MESSAGE_73:
+        return 'best_regards_sent_to_call_selected'
+
+    if message.call2 != callsign:
+        return None
+
+    if message_type == MESSAGE_73:
+        return 'best_regards'
+    if message_type == MESSAGE_RRR:
+        return 'reception_report_received'
+    if message_type == MESSAGE_RR73:
+        return 'report_received_73'
+    if message_type == MESSAGE_CQ:
+        return 'cq_call_selected'
+    if message_type == MESSAGE_REPORT:
+        if message.report[0] == '+':
+            return 'respond_with_positive_signal_report'
+        return 'respond_with_negative_signal_report'
+    if message_type == MESSAGE_ROGER_REPORT:
+        if message.report[0] == '+':
+            return 'confirm_signal_and_respond_with_positive_signal_report'
+        return 'confirm_signal_and_respond_with_negative_signal_report'
+
+    return None
+
+def classify_sequence(messages, your_callsign, callsign):
+    # Retourne la séquence la plus importante et le message correspondant
+    best_sequence_type = None
+    best_message = None
+
+    for message in messages:
+        sequence_type = get_sequence_type(message, your_callsign, callsign)
+        if sequence_type is None:
+            continue
+        if best_sequence_type is None or sequence_priority[sequence_type] < sequence_priority[best_sequence_type]:
+            best_sequence_type = sequence_type
+            best_message = message
+
+    return best_sequence_type, best_message
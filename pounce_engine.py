@@ -0,0 +1,477 @@
+from console_colors import (
+    black_on_brown,
+    black_on_purple,
+    black_on_white,
+    black_on_yellow,
+    bright_green,
+    white_on_blue,
+    white_on_red
+)
+from clock_service import get_clock
+from decode_record import DecodeRingBuffer, SlotDeduplicator
+from log_analysis import (
+    EVEN,
+    ODD,
+    CallsignMatcher,
+    contains_wildcard,
+    decode_sequence
+)
+from latency_stats import (
+    STAGE_ACTION_CONFIRMED,
+    STAGE_ACTION_STARTED,
+    STAGE_CANDIDATE_MATCHED,
+    STAGE_DECISION_MADE,
+    STAGE_LINE_PARSED
+)
+from qso_state import (
+    EVENT_TX_ENABLED,
+    EVENT_TX_HALTED,
+    STATE_IDLE,
+    QSOStateMachine
+)
+from slot_clock import SlotClock
+
+# Actions demandées par le moteur aux backends d'automatisation
+ACTION_PREPARE = "PREPARE"
+ACTION_SET_TX_PERIOD = "SET_TX_PERIOD"
+ACTION_ENABLE_TX = "ENABLE_TX"
+ACTION_HALT_TX = "HALT_TX"
+ACTION_LOG_QSO = "LOG_QSO"
+ACTION_QSY = "QSY"
+
+# Séquences qui justifient l'émission, dans l'ordre de priorité
+active_sequences = [
+    'cq_call_selected',
+    'report_received_73',
+    'reply_to_my_call',
+    'reception_report_received',
+    'best_regards',
+    'best_regards_received_for_my_call',
+    'report_received_73_for_my_call',
+    'respond_with_positive_signal_report',
+    'respond_with_negative_signal_report',
+    'confirm_signal_and_respond_with_positive_signal_report',
+    'confirm_signal_and_respond_with_negative_signal_report'
+]
+
+class ActionIntent:
+    __slots__ = ('action', 'callsign', 'period', 'frequency', 'record', 'not_before', 'deadline', 'trace', 'created_at', 'result')
+
+    def __init__(self, action, callsign=None, period=None, frequency=None, record=None, not_before=None, deadline=None, trace=None):
+        self.action = action
+        self.callsign = callsign
+        self.period = period
+        self.frequency = frequency
+        # Décodage à l'origine de l'action, utilisé par les backends UDP
+        self.record = record
+        # Fenêtre d'exécution alignée sur les séquences FT8 (heure UTC en secondes),
+        # None pour une exécution immédiate
+        self.not_before = not_before
+        self.deadline = deadline
+        # Mesure des latences de l'analyse à l'origine de l'action
+        self.trace = trace
+        self.created_at = get_clock().time()
+        self.result = None
+
+    def __repr__(self):
+        return f"ActionIntent({self.action}, callsign={self.callsign}, period={self.period}, frequency={self.frequency})"
+
+def highlight_wanted_callsigns(wanted_callsigns_list):
+    return black_on_purple(", ".join(wanted_callsigns_list))
+
+def find_wanted_sequences(records, matcher, last_monitor_time, time_max_expected_in_minutes=10, now=None):
+    # Un seul passage sur les décodages pour l'ensemble des indicatifs recherchés
+    candidates = matcher.find_candidates(records, last_monitor_time, time_max_expected_in_minutes, now)
+    candidate = matcher.select_candidate(candidates)
+
+    if candidate is None:
+        return None
+
+    time_difference_in_seconds = candidate['time_difference_in_seconds']
+    if time_difference_in_seconds < 120:
+        time_difference_display = f"{int(time_difference_in_seconds)}s"
+    else:
+        time_difference_display = f"{int(time_difference_in_seconds / 60.0)}m"
+
+    print(f"Il y a {white_on_blue(time_difference_display)}: {black_on_white(candidate['message'])}")
+    return {
+        'sequence' : candidate['sequence'],
+        'sequence_type': candidate['sequence_type'],
+        'message_type': candidate['message_type'],
+        'message': candidate['message'],
+        'period': candidate['period'],
+        'record': candidate['record'],
+        'callsign': candidate['callsign']
+    }
+
+class PounceEngine:
+    # Logique de décision sans interface: les lignes du log entrent,
+    # les actions à réaliser sortent vers les backends abonnés
+    def __init__(
+            self,
+            instance_type,
+            your_callsign,
+            wanted_callsigns_list,
+            instance_mode="Normal",
+            frequency_hopping=None,
+            time_hopping=None,
+            last_number_of_lines=100,
+            instance_state=None,
+            slot_clock=None,
+            latency_tracker=None,
+            clock=None
+        ):
+        self.instance_type = instance_type
+        self.your_callsign = your_callsign
+        self.wanted_callsigns_list = wanted_callsigns_list
+        self.instance_mode = instance_mode
+        self.frequency_hopping = frequency_hopping
+        self.time_hopping = time_hopping
+        self.last_number_of_lines = last_number_of_lines
+        # Horloge réelle ou virtuelle (simulation)
+        self.clock = clock if clock is not None else get_clock()
+        # Reflet de l'état de l'instance (messages UDP Status), None sans UDP
+        self.instance_state = instance_state
+        # Cycle des séquences FT8 pour planifier l'activation de l'émission
+        self.slot_clock = slot_clock if slot_clock is not None else SlotClock(time_source=self.clock.time)
+        # Latences par étape, du décodage écrit à l'action confirmée
+        self.latency_tracker = latency_tracker
+        self.trace = None
+
+        self.excluded_callsigns_list = []
+        self.subscribers = []
+
+        self.hop_index = 0
+        self.force_next_hop = False
+        # Indicatif chargé dans le champ DX Call de l'instance
+        self.prepared_callsign = None
+        # QSO en cours et historique des QSO par indicatif
+        self.qso = None
+        self.qso_targets = {}
+        self.period_found = None
+        self.decoded_sequence = None
+        self.frequency_uptime = None
+        self.finished = False
+
+        self.log_analysis_tracking = {
+            'total_analysis': 0,
+            'last_analysis_time': None,
+            'relevant_sequence': None,
+        }
+
+        # Chaque ligne n'est analysée qu'une seule fois, les décodages sont partagés
+        # et les doublons d'une même séquence écartés
+        self.decode_buffer = DecodeRingBuffer(deduplicator=SlotDeduplicator())
+        # Décodages en attente d'analyse, le temps que le décodeur termine ses écritures
+        self.pending_records = []
+        self.pending_time = None
+
+        # Recherche simultanée de tous les indicatifs voulus
+        self.matcher = CallsignMatcher(your_callsign, wanted_callsigns_list, self.excluded_callsigns_list)
+
+        self.last_monitor_time = self.clock.now()
+
+    @property
+    def active_callsign(self):
+        return self.qso.callsign if self.qso is not None else None
+
+    def focus(self, callsign):
+        qso = self.qso_targets.get(callsign)
+        if qso is None or qso.is_done():
+            qso = QSOStateMachine(self.your_callsign, callsign, self.instance_mode, self.clock.monotonic)
+            self.qso_targets[callsign] = qso
+        self.qso = qso
+
+    def known_tx_period(self):
+        if self.instance_state is None:
+            return None
+        return self.instance_state.known_tx_period()
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def emit(self, action, callsign=None, period=None, frequency=None, record=None, not_before=None, deadline=None, trace=None):
+        intent = ActionIntent(action, callsign, period, frequency, record, not_before, deadline, trace)
+        intent.created_at = self.clock.time()
+        started_at = trace.tracker.clock() if trace is not None else None
+        for callback in self.subscribers:
+            result = callback(intent)
+            if result is not None:
+                intent.result = result
+        # Une action exécutée par un autre thread est mesurée par celui-ci
+        if trace is not None and not trace.asynchronous:
+            trace.mark(STAGE_ACTION_STARTED, started_at)
+            trace.mark(STAGE_ACTION_CONFIRMED)
+        return intent
+
+    def mark(self, stage):
+        if self.trace is not None:
+            self.trace.mark(stage)
+
+    def start(self, initial_lines=None):
+        self.last_monitor_time = self.clock.now()
+
+        if initial_lines:
+            self.decode_buffer.extend_lines(initial_lines)
+
+        if len(self.wanted_callsigns_list) > 1 or contains_wildcard(self.wanted_callsigns_list[0]):
+            callsign = None
+        else:
+            callsign = self.wanted_callsigns_list[0]
+
+        intent = self.emit(ACTION_PREPARE, callsign=callsign)
+        if self.subscribers and intent.result is None:
+            # La fenêtre n'a pas été trouvée
+            return False
+        self.prepared_callsign = callsign
+
+        if self.time_hopping and self.frequency_hopping:
+            self.emit(ACTION_QSY, frequency=self.frequency_hopping[self.hop_index])
+            self.frequency_uptime = self.clock.monotonic()
+
+        return True
+
+    def find_sequences(self, matcher):
+        return find_wanted_sequences(
+            self.decode_buffer.latest(self.last_number_of_lines),
+            matcher,
+            self.last_monitor_time,
+            now=self.clock.now()
+        )
+
+    def start_trace(self, appended_time):
+        if self.latency_tracker is None:
+            return None
+        return self.latency_tracker.start(appended_time)
+
+    def process_lines(self, lines, file_mod_time=None):
+        # Une analyse pour chaque modification du fichier de log
+        trace = self.start_trace(file_mod_time)
+        self.process_records(self.decode_buffer.extend_lines(lines), file_mod_time, buffered=True, trace=trace)
+
+    def queue_lines(self, lines, file_mod_time=None):
+        # Décodages ajoutés au tampon, analysés plus tard par flush
+        records = self.decode_buffer.extend_lines(lines)
+        if records:
+            if not self.pending_records:
+                self.pending_time = file_mod_time
+            self.pending_records.extend(records)
+        return records
+
+    def is_priority(self, records):
+        # Décodage de l'indicatif suivi ou séquence d'un indicatif recherché:
+        # analyse immédiate sans attendre la fin des écritures du décodeur
+        active_callsign = self.active_callsign
+        for record in records:
+            if active_callsign is not None:
+                for message in record.messages:
+                    if active_callsign == message.call1 or active_callsign == message.call2:
+                        return True
+            for hit in self.matcher.match_record(record):
+                if hit[3] in active_sequences:
+                    return True
+        return False
+
+    def flush(self):
+        # Une seule analyse pour l'ensemble des décodages en attente
+        if not self.pending_records:
+            return False
+        records, analysis_time = self.pending_records, self.pending_time
+        self.pending_records = []
+        self.pending_time = None
+        self.process_records(records, analysis_time, buffered=True, trace=self.start_trace(analysis_time))
+        return True
+
+    def process_records(self, new_records, analysis_time=None, buffered=False, trace=None):
+        # Décodages déjà analysés, par exemple reçus par UDP
+        if trace is None:
+            trace = self.start_trace(analysis_time)
+
+        self.log_analysis_tracking['total_analysis'] += 1
+        self.log_analysis_tracking['last_analysis_time'] = analysis_time if analysis_time is not None else self.clock.time()
+
+        if not buffered:
+            new_records = self.decode_buffer.extend_records(new_records)
+
+        if trace is not None:
+            trace.mark(STAGE_LINE_PARSED)
+
+        self.trace = trace
+        self.analyse(new_records)
+        self.trace = None
+
+        if trace is not None and not trace.asynchronous:
+            trace.finish()
+
+    def analyse(self, new_records=()):
+        sequence_found = None
+
+        if self.qso is None:
+            self.log_analysis_tracking['relevant_sequence'] = None
+            # Rechercher dans le fichier un call à partir de la liste
+            sequence_found = self.find_sequences(self.matcher)
+            if sequence_found:
+                self.focus(sequence_found['callsign'])
+                print(f"{white_on_blue('Focus sur')} {self.active_callsign}")
+
+        if self.qso is None:
+            return
+
+        # Chaque décodage ne fait avancer le QSO qu'une seule fois, à son arrivée,
+        # émissions de l'instance comprises (R-report, 73)
+        transition = None
+        for record in new_records:
+            transition = self.qso.on_record(record) or transition
+
+        if sequence_found and sequence_found['record'] not in new_records:
+            # Décodage d'une analyse précédente, vu pour la première fois par le QSO au moment du focus
+            transition = self.qso.on_message(sequence_found['message_type'], record=sequence_found['record']) or transition
+
+        if sequence_found is None:
+            sequence_found = self.find_sequences(CallsignMatcher(self.your_callsign, [self.active_callsign]))
+
+        if sequence_found:
+            self.mark(STAGE_CANDIDATE_MATCHED)
+
+        if self.qso.is_done():
+            if transition is not None and transition.record is not None:
+                # Décodage qui a terminé le QSO, pas forcément le dernier trouvé
+                print(f"Séquence de sortie trouvée {white_on_red(transition.event)}: {black_on_white(transition.record.line.strip())}")
+            else:
+                print(f"Fin de QSO avec {white_on_red(self.active_callsign)}")
+            self.finish_qso()
+            return
+
+        # Si aucune séquence n'a été trouvée, désactiver l'émission
+        if sequence_found is None:
+            if self.qso.state != STATE_IDLE:
+                self.halt_qso()
+            return
+
+        # Recherche de la première séquence décodée
+        if sequence_found['sequence_type'] in active_sequences:
+            self.decoded_sequence = decode_sequence(sequence_found['record'], self.instance_type)
+            self.period_found = sequence_found['period']
+
+        if self.decoded_sequence is not None:
+            # Report active callsign to GUI
+            self.log_analysis_tracking['relevant_sequence'] = self.decoded_sequence
+
+        if not self.force_next_hop:
+            print(f"Séquence trouvée {black_on_brown(sequence_found['sequence'])} {bright_green('[' + str(self.period_found) + ']')}. Activation de la fenêtre et check état.")
+
+        self.frequency_uptime = self.clock.monotonic()
+
+        # Emission sur la période opposée à celle de la séquence trouvée
+        if self.period_found == EVEN:
+            tx_period = ODD
+        elif self.period_found == ODD:
+            tx_period = EVEN
+        else:
+            tx_period = None
+
+        if self.instance_type == 'JTDX':
+            if tx_period is not None and self.known_tx_period() != tx_period:
+                self.emit(ACTION_SET_TX_PERIOD, callsign=self.active_callsign, period=tx_period)
+
+        if self.prepared_callsign != self.active_callsign:
+            self.emit(ACTION_PREPARE, callsign=self.active_callsign)
+            self.prepared_callsign = self.active_callsign
+
+        # Check sur le bouton Enable TX / DX Call
+        if self.instance_state is not None and self.instance_state.is_tx_enabled_for(self.active_callsign):
+            print(f"{white_on_red('Enable TX')} actif (Status). Le monitoring se poursuit.")
+        else:
+            # A terminer avant le début de la prochaine séquence d'émission
+            not_before, deadline = (None, None)
+            if tx_period is not None:
+                not_before, deadline = self.slot_clock.schedule(tx_period)
+            self.mark(STAGE_DECISION_MADE)
+            self.emit(
+                ACTION_ENABLE_TX,
+                callsign=self.active_callsign,
+                period=tx_period,
+                record=sequence_found['record'],
+                not_before=not_before,
+                deadline=deadline,
+                trace=self.trace
+            )
+        self.qso.advance(EVENT_TX_ENABLED)
+
+    def finish_qso(self):
+        active_callsign = self.active_callsign
+
+        if self.instance_type == 'JTDX':
+            if self.instance_mode != "Normal":
+                self.emit(ACTION_HALT_TX)
+                self.prepared_callsign = None
+        elif self.instance_type == 'WSJT':
+            self.emit(ACTION_LOG_QSO)
+            self.prepared_callsign = None
+
+        if active_callsign in self.wanted_callsigns_list:
+            # Retirer l'indicatif des wanted
+            self.wanted_callsigns_list.remove(active_callsign)
+            self.matcher.set_wanted_callsigns(self.wanted_callsigns_list)
+        else:
+            # Ajouter l'indicatif aux excluded_callsigns_list
+            self.excluded_callsigns_list.append(active_callsign)
+
+        self.qso = None
+
+        # Est ce que le script doit poursuivre en utilisant d'autres fréquences?
+        if self.frequency_hopping:
+            # Supprime la fréquence car terminé
+            del self.frequency_hopping[self.hop_index]
+            if not self.frequency_hopping:
+                print(white_on_red("Arrêt du script car plus de fréquence à explorer."))
+                self.finished = True
+            else:
+                self.force_next_hop = True
+        elif self.wanted_callsigns_list:
+            if self.instance_type == 'JTDX':
+                self.emit(ACTION_HALT_TX)
+            self.prepared_callsign = None
+
+            self.force_next_hop = True
+            print(f"\n=== Reprise Monitoring pour {self.instance_type} {highlight_wanted_callsigns(self.wanted_callsigns_list)} ===")
+        else:
+            print(white_on_red("Arrêt du script car plus d'indicatif à rechercher."))
+            self.finished = True
+
+    def halt_qso(self):
+        print(f"{black_on_yellow('Disable TX')}. Pas de séquence trouvée pour {bright_green(self.active_callsign)}. Le monitoring se poursuit.")
+
+        if self.instance_type == 'JTDX':
+            self.emit(ACTION_HALT_TX)
+        self.prepared_callsign = None
+        self.qso.advance(EVENT_TX_HALTED)
+
+        # On peut chasser d'autres indicatifs
+        if len(self.wanted_callsigns_list) > 1:
+            self.qso = None
+        # On considère que le active_callsign n'est pas dans wanted_callsigns_list
+        # et qu'il répond à un Wildcard
+        elif self.active_callsign not in self.wanted_callsigns_list:
+            self.qso = None
+
+        self.log_analysis_tracking['relevant_sequence'] = None
+
+    def check_frequency_hopping(self):
+        if not (self.time_hopping and self.frequency_hopping):
+            return
+
+        # Vérifier si time_hopping exprimé en minutes a été dépassé
+        if (self.clock.monotonic() - self.frequency_uptime) > self.time_hopping * 60 or self.force_next_hop:
+            # Au prochain passage dans la boucle inutile de changer à nouveau de fréquence
+            if self.force_next_hop:
+                self.force_next_hop = False
+                debug_to_print = "Changement de fréquence demandé"
+            else:
+                debug_to_print = f"{self.time_hopping} minute(s) écoulée(s)"
+
+            self.hop_index = (self.hop_index + 1) % len(self.frequency_hopping)
+            self.emit(ACTION_QSY, frequency=self.frequency_hopping[self.hop_index])
+            print(f"{white_on_blue(self.clock.now().strftime('%H%Mz %d %b'))} {debug_to_print}. Fréquence modifiée (frequency_hopping)")
+
+            self.frequency_uptime = self.clock.monotonic()
@@ -9,6 +9,8 @@ import threading
 import datetime
 import sys
 import wait_and_pounce
+from clock_service import get_clock
+from debug_redirector import DebugRedirector
 import re
 import time
 from pystray import Icon, MenuItem
@@ -135,63 +137,6 @@ class ToolTip:
             self.tooltip_window.destroy()
             self.tooltip_window = None
 
-class DebugRedirector:
-    def __init__(self, widget, log_filename):
-        self.widget = widget
-        self.log_filename = log_filename
-        self.buffer = '' 
-
-    def write(self, string):
-        self.buffer += string
-        if '\n' in self.buffer:
-            lines = self.buffer.splitlines(keepends=True)
-            for line in lines:
-                if line.endswith('\n'):
-                    clean_string = self.remove_tag_codes(line)
-                    self.write_to_log(clean_string)
-                    gui_queue.put(lambda l=line: self.widget.after(0, self.apply_tags, l))
-            self.buffer = lines[-1] if not lines[-1].endswith('\n') else ''
-
-        gui_queue.put(self.update_clear_button_state)
-
-    def update_clear_button_state(self):
-        if self.widget.get(1.0, tk.END).strip():  
-            clear_button.config(state=tk.NORMAL) 
-        else:
-            clear_button.config(state=tk.DISABLED) 
-
-    def write_to_log(self, clean_string):
-        with open(self.log_filename, "a") as log_file:
-            timestamp = datetime.datetime.now().strftime("%y%m%d_%H%M%S")
-            log_file.write(f"{timestamp} {clean_string}")
-
-    def remove_tag_codes(self, string):
-        tag_escape = re.compile(r'\[/?[a-zA-Z_]+\]')
-        return tag_escape.sub('', string)
-
-    def apply_tags(self, string):
-        tag_pattern = re.compile(r'\[(.*?)\](.*?)\[/.*?\]')
-        
-        last_pos = 0
-        for match in tag_pattern.finditer(string):
-            tag = match.group(1)  
-            text = match.group(2) 
-
-            if last_pos < match.start():
-                self.widget.insert(tk.END, string[last_pos:match.start()])
-
-            self.widget.insert(tk.END, text, tag)
-
-            last_pos = match.end()
-
-        if last_pos < len(string):
-            self.widget.insert(tk.END, string[last_pos:])
-        
-        self.widget.see(tk.END)
-
-    def flush(self):
-        pass
-
 def copy_to_clipboard(event):
     text = focus_value_label.cget("text")
     pyperclip.copy(text)
@@ -468,12 +413,26 @@ def stop_monitoring():
     run_button.config(state="normal", background="SystemButtonFace", text=WAIT_POUNCE_LABEL)
     enable_inputs()
 
+def show_latency_stats():
+    report = wait_and_pounce.dump_latency_stats()
+
+    latency_window = tk.Toplevel(root)
+    latency_window.title("Latency (decode -> Enable TX)")
+    latency_window.resizable(False, False)
+
+    latency_text = tk.Text(latency_window, height=9, width=72, bg="#D3D3D3", font=consolas_font)
+    latency_text.insert(tk.END, report)
+    latency_text.config(state=tk.DISABLED)
+    latency_text.pack(padx=10, pady=10)
+
+    tk.Button(latency_window, text="Close", command=latency_window.destroy).pack(pady=5)
+
 def control_log_analysis_tracking(log_analysis_tracking):
     if log_analysis_tracking is None:
         gui_queue.put(lambda: counter_value_label.config(text=WAITING_DATA_ANALYSIS_LABEL, bg="yellow"))
         gui_queue.put(lambda: focus_frame.grid_remove())  
     else:
-        current_time = datetime.datetime.now().timestamp()
+        current_time = get_clock().time()
         time_difference = current_time - log_analysis_tracking['last_analysis_time']
         
         min_time = 60 
@@ -523,7 +482,8 @@ def check_callsign(log_analysis_tracking):
         gui_queue.put(lambda: focus_frame.grid_remove())  
 
 def update_timer_with_ft8_sequence():
-    current_time = datetime.datetime.now(datetime.timezone.utc)
+    # Heure UTC de l'horloge commune, la couleur suit la période de la séquence en cours
+    current_time = get_clock().now()
     utc_time = current_time.strftime("%H:%M:%S")
 
     if (current_time.second // 15) % 2 == 0:
@@ -696,13 +656,17 @@ run_button.pack(side="left", padx=5)
 stop_button = tk.Button(button_frame, text="Stop all", command=stop_monitoring)
 stop_button.pack(side="left", padx=5)
 
+# Bouton pour afficher les latences mesurées
+latency_button = tk.Button(button_frame, text="Latency", command=show_latency_stats)
+latency_button.pack(side="left", padx=5)
+
 check_fields()
 
 # Met à jour la Listbox avec l'historique
 update_listbox()
 
 log_filename = get_log_filename()
-sys.stdout = DebugRedirector(output_text, log_filename)
+sys.stdout = DebugRedirector(output_text, log_filename, gui_queue, clear_button)
 
 # Exécution de la boucle principale
 if __name__ == "__main__":
@@ -0,0 +1,174 @@
+from clock_service import get_clock
+from message_classifier import (
+    MESSAGE_73,
+    MESSAGE_CQ,
+    MESSAGE_ROGER_REPORT,
+    MESSAGE_RR73,
+    MESSAGE_RRR
+)
+
+# Etats d'un QSO avec l'indicatif visé
+STATE_IDLE = "IDLE"
+STATE_CALLING = "CALLING"
+STATE_REPORT_RCVD = "REPORT_RCVD"
+STATE_ROGER_SENT = "ROGER_SENT"
+STATE_RR73_RCVD = "RR73_RCVD"
+STATE_DONE = "DONE"
+
+# Evénements issus des messages classifiés ou des actions du moteur
+EVENT_CQ = "CQ"
+EVENT_ACTIVITY = "ACTIVITY"
+EVENT_REPORT_RCVD = "REPORT_RCVD"
+EVENT_ROGER_SENT = "ROGER_SENT"
+EVENT_RR73_RCVD = "RR73_RCVD"
+EVENT_RRR_RCVD = "RRR_RCVD"
+EVENT_73_RCVD = "73_RCVD"
+EVENT_73_SENT = "73_SENT"
+EVENT_TX_ENABLED = "TX_ENABLED"
+EVENT_TX_HALTED = "TX_HALTED"
+
+def build_normal_table():
+    # Mode normal: le QSO se termine sur un 73 envoyé ou reçu
+    table = {
+        (STATE_IDLE, EVENT_TX_ENABLED): STATE_CALLING,
+        (STATE_IDLE, EVENT_REPORT_RCVD): STATE_REPORT_RCVD,
+        (STATE_CALLING, EVENT_REPORT_RCVD): STATE_REPORT_RCVD,
+        (STATE_CALLING, EVENT_ROGER_SENT): STATE_ROGER_SENT,
+        (STATE_REPORT_RCVD, EVENT_ROGER_SENT): STATE_ROGER_SENT,
+    }
+
+    for state in (STATE_IDLE, STATE_CALLING, STATE_REPORT_RCVD, STATE_ROGER_SENT):
+        table[(state, EVENT_RR73_RCVD)] = STATE_RR73_RCVD
+        table[(state, EVENT_RRR_RCVD)] = STATE_RR73_RCVD
+
+    for state in (STATE_IDLE, STATE_CALLING, STATE_REPORT_RCVD, STATE_ROGER_SENT, STATE_RR73_RCVD):
+        table[(state, EVENT_73_RCVD)] = STATE_DONE
+        table[(state, EVENT_73_SENT)] = STATE_DONE
+
+    for state in (STATE_CALLING, STATE_REPORT_RCVD, STATE_ROGER_SENT, STATE_RR73_RCVD):
+        table[(state, EVENT_TX_HALTED)] = STATE_IDLE
+
+    return table
+
+def build_hound_table():
+    # Mode Hound: le Fox termine le QSO par RR73, le Hound ne renvoie pas de 73.
+    # Un RRR ne termine pas le QSO, le Fox n'en envoie pas
+    table = {
+        (STATE_IDLE, EVENT_TX_ENABLED): STATE_CALLING,
+        (STATE_IDLE, EVENT_REPORT_RCVD): STATE_REPORT_RCVD,
+        (STATE_CALLING, EVENT_REPORT_RCVD): STATE_REPORT_RCVD,
+        (STATE_CALLING, EVENT_ROGER_SENT): STATE_ROGER_SENT,
+        (STATE_REPORT_RCVD, EVENT_ROGER_SENT): STATE_ROGER_SENT,
+    }
+
+    for state in (STATE_IDLE, STATE_CALLING, STATE_REPORT_RCVD, STATE_ROGER_SENT):
+        table[(state, EVENT_RR73_RCVD)] = STATE_DONE
+
+    for state in (STATE_CALLING, STATE_REPORT_RCVD, STATE_ROGER_SENT):
+        table[(state, EVENT_TX_HALTED)] = STATE_IDLE
+
+    return table
+
+transition_tables = {
+    "Normal": build_normal_table(),
+    "Fox/Hound": build_hound_table(),
+    # SuperFox: le RR73 arrive dans un message multi-stream, déjà découpé par classify_message
+    "SuperFox": build_hound_table(),
+}
+
+def classify_event(message, your_callsign, callsign):
+    # Evénement du QSO avec callsign porté par un message FT8 déjà classifié
+    message_type = message.message_type
+
+    if message.call1 == your_callsign and message.call2 == callsign:
+        if message_type == MESSAGE_RR73:
+            return EVENT_RR73_RCVD
+        if message_type == MESSAGE_RRR:
+            return EVENT_RRR_RCVD
+        if message_type == MESSAGE_73:
+            return EVENT_73_RCVD
+        return EVENT_REPORT_RCVD
+
+    if message.call1 == callsign and message.call2 == your_callsign:
+        if message_type == MESSAGE_ROGER_REPORT:
+            return EVENT_ROGER_SENT
+        if message_type == MESSAGE_73:
+            return EVENT_73_SENT
+        return None
+
+    if message.call2 == callsign:
+        if message_type == MESSAGE_CQ:
+            return EVENT_CQ
+        return EVENT_ACTIVITY
+
+    return None
+
+class QSOTransition:
+    __slots__ = ('from_state', 'to_state', 'event', 'timestamp', 'elapsed', 'record')
+
+    def __init__(self, from_state, to_state, event, timestamp, elapsed, record=None):
+        self.from_state = from_state
+        self.to_state = to_state
+        self.event = event
+        self.timestamp = timestamp
+        self.elapsed = elapsed
+        # Décodage à l'origine de la transition, None pour une action du moteur
+        self.record = record
+
+    def __repr__(self):
+        return f"QSOTransition({self.from_state} -> {self.to_state}, event={self.event}, elapsed={self.elapsed:.3f}s)"
+
+class QSOStateMachine:
+    # Progression du QSO avec un indicatif, une recherche dans la table par événement
+    def __init__(self, your_callsign, callsign, instance_mode="Normal", clock=None):
+        self.your_callsign = your_callsign
+        self.callsign = callsign
+        self.instance_mode = instance_mode
+        self.table = transition_tables.get(instance_mode, transition_tables["Fox/Hound"])
+        self.clock = clock if clock is not None else get_clock().monotonic
+        self.state = STATE_IDLE
+        self.started_at = self.clock()
+        self.state_since = self.started_at
+        self.transitions = []
+
+    def advance(self, event, now=None, record=None):
+        # Retourne la transition effectuée, ou None si l'événement ne change pas l'état
+        if event is None:
+            return None
+
+        to_state = self.table.get((self.state, event))
+        if to_state is None:
+            return None
+
+        if now is None:
+            now = self.clock()
+
+        transition = QSOTransition(self.state, to_state, event, now, now - self.state_since, record)
+        self.transitions.append(transition)
+        self.state = to_state
+        self.state_since = now
+        return transition
+
+    def on_message(self, message, now=None, record=None):
+        return self.advance(classify_event(message, self.your_callsign, self.callsign), now, record)
+
+    def on_record(self, record, now=None):
+        transition = None
+        for message in record.messages:
+            transition = self.on_message(message, now, record) or transition
+        return transition
+
+    def is_done(self):
+        return self.state == STATE_DONE
+
+    def time_in_state(self, now=None):
+        if now is None:
+            now = self.clock()
+        return now - self.state_since
+
+    def durations(self):
+        # Temps cumulé passé dans chaque état
+        durations = {}
+        for transition in self.transitions:
+            durations[transition.from_state] = durations.get(transition.from_state, 0.0) + transition.elapsed
+        return durations
@@ -0,0 +1,121 @@
+import time
+import socket
+
+from console_colors import (
+    black_on_purple,
+    bright_green,
+    white_on_red
+)
+from pounce_engine import ACTION_QSY
+
+# Port TCP par défaut de rigctld (Hamlib)
+default_rigctld_port = 4532
+
+# Délai maximal d'une réponse de rigctld
+rigctld_timeout = 2
+
+# Ecart toléré entre la fréquence demandée et la fréquence relue, en Hz
+frequency_tolerance = 10
+
+class RigctldError(Exception):
+    pass
+
+class RigctldClient:
+    # Connexion TCP persistante à rigctld (protocole texte de Hamlib).
+    # JTDX / WSJT-X doivent eux-mêmes passer par ce rigctld (Hamlib NET rigctl)
+    # pour que la fréquence changée soit vue par l'instance
+    def __init__(self, host="127.0.0.1", port=default_rigctld_port, timeout=rigctld_timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.sock = None
+        self.reader = None
+
+    def connect(self):
+        if self.sock is not None:
+            return
+        self.sock = socket.create_connection((self.host, self.port), self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.reader = self.sock.makefile('rb')
+
+    def close(self):
+        if self.sock is None:
+            return
+        try:
+            self.sock.sendall(b"q\n")
+        except OSError:
+            pass
+        self.reader.close()
+        self.sock.close()
+        self.sock = None
+        self.reader = None
+
+    def exchange(self, command):
+        self.connect()
+        self.sock.sendall(command.encode('ascii') + b"\n")
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("Connexion fermée par rigctld")
+        return line.decode('ascii', 'replace').strip()
+
+    def command(self, command):
+        # Une seule tentative de reconnexion si rigctld a été relancé
+        try:
+            return self.exchange(command)
+        except OSError:
+            self.close()
+            return self.exchange(command)
+
+    def set_freq(self, frequency_hz):
+        response = self.command(f"F {int(frequency_hz)}")
+        if response != "RPRT 0":
+            raise RigctldError(f"set_freq {frequency_hz}: {response}")
+
+    def get_freq(self):
+        response = self.command("f")
+        if response.startswith("RPRT"):
+            raise RigctldError(f"get_freq: {response}")
+        try:
+            return int(float(response))
+        except ValueError:
+            raise RigctldError(f"get_freq: réponse invalide {response!r}")
+
+    def set_and_confirm_freq(self, frequency_hz):
+        # Relecture de la fréquence pour confirmer le changement
+        self.set_freq(frequency_hz)
+        read_back = self.get_freq()
+        if abs(read_back - frequency_hz) > frequency_tolerance:
+            raise RigctldError(f"fréquence relue {read_back} Hz au lieu de {frequency_hz} Hz")
+        return read_back
+
+class CatControlBackend:
+    # Changement de fréquence par CAT (rigctld) au lieu de la saisie dans la fenêtre.
+    # Les autres actions sont confiées au backend de repli, de même qu'un QSY
+    # si rigctld ne répond pas
+    def __init__(self, client, fallback=None):
+        self.client = client
+        self.fallback = fallback
+
+    def handle(self, intent):
+        if intent.action == ACTION_QSY:
+            if self.qsy(intent.frequency):
+                return True
+        if self.fallback is not None:
+            return self.fallback.handle(intent)
+        return None
+
+    def qsy(self, frequency_khz):
+        start = time.perf_counter()
+        try:
+            self.client.set_and_confirm_freq(frequency_khz * 1000)
+        except (OSError, RigctldError) as e:
+            self.client.close()
+            print(white_on_red(f"Erreur CAT rigctld {self.client.host}:{self.client.port}: {e}"))
+            return False
+
+        duration = (time.perf_counter() - start) * 1000
+        print(f"Mise à jours de la fréquence: {black_on_purple(str(frequency_khz) + 'Khz')} {bright_green(f'[CAT {duration:.2f} ms]')}")
+        return True
+
+    def close(self):
+        self.client.close()
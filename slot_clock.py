@@ -0,0 +1,94 @@
+import datetime
+
+from clock_service import get_clock
+from log_analysis import EVEN, ODD
+
+# Durée d'une séquence FT8 en secondes
+slot_duration = 15
+
+# Avance par défaut d'une action sur le début de la séquence d'émission, en secondes
+default_tx_lead_time = 0.5
+
+utc = datetime.timezone.utc
+
+class SlotPosition:
+    __slots__ = ('slot', 'parity', 'phase', 'start')
+
+    def __init__(self, slot, parity, phase, start):
+        self.slot = slot
+        self.parity = parity
+        # Secondes écoulées depuis le début de la séquence
+        self.phase = phase
+        self.start = start
+
+    def __repr__(self):
+        return f"SlotPosition(slot={self.slot}, parity={self.parity}, phase={self.phase:.3f})"
+
+class SlotClock:
+    # Cycle FT8 calculé depuis l'heure UTC: séquences paires à 00 et 30 secondes,
+    # impaires à 15 et 45 secondes. clock_offset corrige l'horloge locale
+    # (en secondes, ajouté à l'heure système)
+    def __init__(self, clock_offset=0.0, tx_lead_time=default_tx_lead_time, time_source=None):
+        self.clock_offset = clock_offset
+        self.tx_lead_time = tx_lead_time
+        self.time_source = time_source if time_source is not None else get_clock().time
+
+    def now(self):
+        return self.time_source() + self.clock_offset
+
+    def slot_at(self, timestamp):
+        return int(timestamp // slot_duration)
+
+    def parity_of(self, slot):
+        # Une journée compte un nombre pair de séquences: la parité depuis l'epoch
+        # est celle des secondes de la journée
+        return EVEN if slot % 2 == 0 else ODD
+
+    def slot_start(self, slot):
+        return slot * slot_duration
+
+    def position(self, timestamp=None):
+        if timestamp is None:
+            timestamp = self.now()
+        slot = self.slot_at(timestamp)
+        start = self.slot_start(slot)
+        return SlotPosition(slot, self.parity_of(slot), timestamp - start, start)
+
+    def next_slot_start(self, parity, timestamp=None):
+        # Début de la prochaine séquence de la parité demandée, strictement après timestamp
+        if timestamp is None:
+            timestamp = self.now()
+        slot = self.slot_at(timestamp) + 1
+        if self.parity_of(slot) != parity:
+            slot += 1
+        return self.slot_start(slot)
+
+    def schedule(self, parity, timestamp=None):
+        # Fenêtre d'exécution d'une action qui doit être terminée tx_lead_time avant
+        # le début d'une séquence d'émission de la parité demandée.
+        # Retourne (au plus tôt, échéance). Pendant une séquence de cette parité, ou trop près
+        # de son début, l'action est reportée à la séquence suivante plutôt
+        # que de provoquer une émission tronquée
+        if timestamp is None:
+            timestamp = self.now()
+
+        not_before = timestamp
+        slot = self.slot_at(timestamp)
+        if self.parity_of(slot) == parity:
+            not_before = self.slot_start(slot + 1)
+
+        tx_start = self.next_slot_start(parity, not_before)
+        deadline = tx_start - self.tx_lead_time
+        if not_before > deadline:
+            not_before = tx_start + slot_duration
+            deadline += 2 * slot_duration
+
+        return not_before, deadline
+
+    def format_time(self, timestamp):
+        return datetime.datetime.fromtimestamp(timestamp, utc).strftime('%H:%M:%S.%f')[:-3]
+
+def period_at(moment):
+    # Parité de la séquence d'un datetime UTC
+    seconds = (moment.hour * 60 + moment.minute) * 60 + moment.second
+    return EVEN if (seconds // slot_duration) % 2 == 0 else ODD
@@ -0,0 +1,563 @@
+import os
+import sys
+import time
+import random
+import socket
+import argparse
+import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from log_analysis import EVEN, ODD
+from udp_listener import default_udp_port
+from wsjtx_protocol import (
+    Decode,
+    Heartbeat,
+    Status,
+    encode_message,
+    milliseconds_since_midnight
+)
+
+# Activité FT8 synthétique d'une bande pour les essais de charge: lignes ALL.TXT
+# au format JTDX ou WSJT-X, et en option messages UDP Decode. Stations en CQ
+# et en QSO, pileup sur un DX (Normal, Fox/Hound ou SuperFox), croissance de
+# l'activité d'un jour à l'autre. Même graine, même fichier
+
+utc = datetime.timezone.utc
+
+slot_duration = 15
+
+prefixes = [
+    "K", "W", "N", "AA", "KD", "VE", "DL", "DK", "F", "G", "M", "EA", "I", "IK", "ON", "PA",
+    "OH", "SM", "LA", "OZ", "OK", "SP", "HA", "YO", "LZ", "S5", "9A", "UA", "UR", "JA",
+    "JH", "VK", "ZL", "PY", "LU", "CE", "ZS", "4X", "HB9", "OE", "CT", "EI", "GM", "YB"
+]
+suffix_letters = "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+grid_letters = "ABCDEFGHIJKLMNOPQR"
+
+# Distributions des décodages
+default_snr_mean = -10
+default_snr_deviation = 7
+min_snr = -24
+max_snr = 20
+default_dt_mean = 0.2
+default_dt_deviation = 0.3
+min_hz = 200
+max_hz = 2900
+
+# Le Fox émet sous 1000 Hz, les Hounds appellent au-dessus
+fox_min_hz = 300
+hound_min_hz = 1000
+
+# Nombre de messages par émission du Fox
+fox_streams = 5
+superfox_streams = 9
+
+# Etapes d'un QSO: l'appelant émet aux étapes paires, la station appelée aux étapes impaires
+QSO_CALL = 0
+QSO_REPORT = 1
+QSO_ROGER_REPORT = 2
+QSO_RR73 = 3
+QSO_73 = 4
+
+# Proportion de messages non décodés (QSB, QRM)
+default_miss_ratio = 0.1
+
+class Station:
+    __slots__ = ('callsign', 'grid', 'parity', 'hz', 'snr', 'dt', 'busy')
+
+    def __init__(self, callsign, grid, parity, hz, snr, dt):
+        self.callsign = callsign
+        self.grid = grid
+        self.parity = parity
+        self.hz = hz
+        self.snr = snr
+        self.dt = dt
+        self.busy = False
+
+class Qso:
+    __slots__ = ('caller', 'called', 'step')
+
+    def __init__(self, caller, called, step=QSO_CALL):
+        self.caller = caller
+        self.called = called
+        self.step = step
+
+    def sender(self):
+        return self.caller if self.step % 2 == 0 else self.called
+
+    def message(self, rng):
+        if self.step % 2 == 0:
+            to_call, from_call = self.called.callsign, self.caller.callsign
+        else:
+            to_call, from_call = self.caller.callsign, self.called.callsign
+
+        if self.step == QSO_CALL:
+            text = self.caller.grid
+        elif self.step == QSO_REPORT:
+            text = format_report(rng)
+        elif self.step == QSO_ROGER_REPORT:
+            text = "R" + format_report(rng)
+        elif self.step == QSO_RR73:
+            text = "RR73"
+        else:
+            text = "73"
+        return f"{to_call} {from_call} {text}"
+
+def format_report(rng):
+    return f"{max(min_snr, min(max_snr, int(rng.gauss(default_snr_mean, default_snr_deviation)))):+03d}"
+
+def random_callsign(rng, used):
+    while True:
+        callsign = rng.choice(prefixes) + str(rng.randint(0, 9)) + "".join(rng.choice(suffix_letters) for _ in range(rng.randint(1, 3)))
+        if callsign not in used:
+            used.add(callsign)
+            return callsign
+
+def random_grid(rng):
+    return rng.choice(grid_letters) + rng.choice(grid_letters) + str(rng.randint(0, 9)) + str(rng.randint(0, 9))
+
+def opposite(parity):
+    return ODD if parity == EVEN else EVEN
+
+def slot_parity(moment):
+    seconds = (moment.hour * 60 + moment.minute) * 60 + moment.second
+    return EVEN if (seconds // slot_duration) % 2 == 0 else ODD
+
+class BandActivity:
+    def __init__(
+            self,
+            station_count=500,
+            decodes_per_slot=40,
+            cq_ratio=0.3,
+            dx_callsign=None,
+            pileup=0,
+            dx_mode="Normal",
+            your_callsign=None,
+            snr_mean=default_snr_mean,
+            snr_deviation=default_snr_deviation,
+            dt_mean=default_dt_mean,
+            dt_deviation=default_dt_deviation,
+            miss_ratio=default_miss_ratio,
+            seed=None
+        ):
+        self.rng = random.Random(seed)
+        self.decodes_per_slot = decodes_per_slot
+        self.cq_ratio = cq_ratio
+        self.dx_mode = dx_mode
+        self.snr_mean = snr_mean
+        self.snr_deviation = snr_deviation
+        self.dt_mean = dt_mean
+        self.dt_deviation = dt_deviation
+        self.miss_ratio = miss_ratio
+
+        used = set()
+        if dx_callsign:
+            used.add(dx_callsign)
+        if your_callsign:
+            used.add(your_callsign)
+
+        self.idle = {EVEN: [], ODD: []}
+        for index in range(station_count):
+            station = self.new_station(random_callsign(self.rng, used), EVEN if index % 2 == 0 else ODD)
+            self.idle[station.parity].append(station)
+        self.qsos = []
+
+        # Pileup: les appelants émettent sur la période opposée à celle du DX
+        self.dx = None
+        self.hounds = []
+        self.dx_qso = None
+        self.fox_streams = []
+        if dx_callsign:
+            self.dx = self.new_station(dx_callsign, EVEN, fox_min_hz if dx_mode != "Normal" else None)
+            self.dx.busy = True
+            min_caller_hz = hound_min_hz if dx_mode != "Normal" else min_hz
+            if your_callsign:
+                self.hounds.append(self.new_station(your_callsign, ODD, min_caller_hz))
+            for _ in range(max(0, pileup - len(self.hounds))):
+                self.hounds.append(self.new_station(random_callsign(self.rng, used), ODD, min_caller_hz))
+
+        self.worked = []
+
+    def new_station(self, callsign, parity, min_station_hz=None):
+        rng = self.rng
+        if min_station_hz is None:
+            min_station_hz = min_hz
+        max_station_hz = 1000 if min_station_hz == fox_min_hz else max_hz
+        return Station(
+            callsign,
+            random_grid(rng),
+            parity,
+            rng.randint(min_station_hz, max_station_hz),
+            rng.gauss(self.snr_mean, self.snr_deviation),
+            rng.gauss(self.dt_mean, self.dt_deviation)
+        )
+
+    def decode(self, station, message):
+        rng = self.rng
+        snr = max(min_snr, min(max_snr, int(round(station.snr + rng.gauss(0, 2)))))
+        dt = round(station.dt + rng.gauss(0, 0.05), 1)
+        return (snr, dt, station.hz, message)
+
+    def take_idle(self, parity):
+        stations = self.idle[parity]
+        if not stations:
+            return None
+        index = self.rng.randrange(len(stations))
+        stations[index], stations[-1] = stations[-1], stations[index]
+        station = stations.pop()
+        station.busy = True
+        return station
+
+    def release(self, station):
+        station.busy = False
+        self.idle[station.parity].append(station)
+
+    def next_slot(self, parity, activity=1.0):
+        # Décodages d'une séquence de la parité donnée, dans l'ordre d'écriture
+        rng = self.rng
+        decodes = []
+
+        # QSO en cours dont c'est le tour d'émettre
+        running = []
+        for qso in self.qsos:
+            sender = qso.sender()
+            if sender.parity == parity:
+                if rng.random() >= self.miss_ratio:
+                    decodes.append(self.decode(sender, qso.message(rng)))
+                qso.step += 1
+            if qso.step > QSO_73:
+                self.release(qso.caller)
+                self.release(qso.called)
+            else:
+                running.append(qso)
+        self.qsos = running
+
+        if self.dx is not None:
+            decodes.extend(self.dx_slot(parity))
+
+        # Nouveaux CQ et nouveaux appels jusqu'au nombre de décodages attendu
+        target = int(self.decodes_per_slot * activity)
+        while len(decodes) < target:
+            station = self.take_idle(parity)
+            if station is None:
+                break
+            if rng.random() < self.cq_ratio:
+                decodes.append(self.decode(station, f"CQ {station.callsign} {station.grid}"))
+                caller = self.take_idle(opposite(parity))
+                if caller is None:
+                    self.release(station)
+                else:
+                    # Réponse au CQ à la séquence suivante
+                    self.qsos.append(Qso(caller, station))
+            else:
+                called = self.take_idle(opposite(parity))
+                if called is None:
+                    self.release(station)
+                    break
+                qso = Qso(station, called)
+                decodes.append(self.decode(station, qso.message(rng)))
+                qso.step += 1
+                self.qsos.append(qso)
+
+        # Ordre des fréquences comme dans l'affichage de JTDX et WSJT-X
+        decodes.sort(key=lambda decode: decode[2])
+        return decodes
+
+    def dx_slot(self, parity):
+        if self.dx_mode == "Normal":
+            return self.normal_dx_slot(parity)
+        return self.fox_slot(parity)
+
+    def waiting_hounds(self):
+        streams = set(id(stream[0]) for stream in self.fox_streams)
+        if self.dx_qso is not None:
+            streams.add(id(self.dx_qso.caller))
+        return [hound for hound in self.hounds if id(hound) not in streams]
+
+    def call_dx(self, message_format):
+        # Appels des stations du pileup, une partie seulement est décodée
+        decodes = []
+        for hound in self.waiting_hounds():
+            if self.rng.random() < 0.7:
+                decodes.append(self.decode(hound, message_format.format(dx=self.dx.callsign, hound=hound.callsign, grid=hound.grid)))
+        return decodes
+
+    def normal_dx_slot(self, parity):
+        rng = self.rng
+        dx = self.dx
+        decodes = []
+
+        if parity == dx.parity:
+            if self.dx_qso is None and self.hounds:
+                # Le DX répond directement à l'un des appelants
+                self.dx_qso = Qso(rng.choice(self.hounds), dx, QSO_REPORT)
+            if self.dx_qso is None:
+                decodes.append(self.decode(dx, f"CQ {dx.callsign} {dx.grid}"))
+            else:
+                decodes.append(self.decode(dx, self.dx_qso.message(rng)))
+                self.dx_qso.step += 1
+                if self.dx_qso.step > QSO_RR73:
+                    # Le 73 de l'appelant n'est pas attendu
+                    self.finish_hound(self.dx_qso.caller)
+                    self.dx_qso = None
+        else:
+            if self.dx_qso is not None and self.dx_qso.step == QSO_ROGER_REPORT:
+                decodes.append(self.decode(self.dx_qso.caller, self.dx_qso.message(rng)))
+                self.dx_qso.step += 1
+            decodes.extend(self.call_dx("{dx} {hound} {grid}"))
+        return decodes
+
+    def finish_hound(self, hound):
+        self.hounds.remove(hound)
+        self.worked.append(hound.callsign)
+
+    def fox_slot(self, parity):
+        # Fox/Hound: messages multiples "K1ABC RR73; W9XYZ <FOX> -12" sous 1000 Hz.
+        # SuperFox: un message par Hound, l'indicatif du Fox haché
+        rng = self.rng
+        dx = self.dx
+        decodes = []
+        superfox = self.dx_mode == "SuperFox"
+        max_streams = superfox_streams if superfox else fox_streams
+
+        if parity != dx.parity:
+            # Les Hounds appelés confirment le report reçu
+            for hound, step in self.fox_streams:
+                if step == QSO_REPORT:
+                    decodes.append(self.decode(hound, f"{dx.callsign} {hound.callsign} R{format_report(rng)}"))
+            self.fox_streams = [(hound, QSO_ROGER_REPORT if step == QSO_REPORT else step) for hound, step in self.fox_streams]
+            decodes.extend(self.call_dx("{dx} {hound} {grid}"))
+            return decodes
+
+        finished = [hound for hound, step in self.fox_streams if step == QSO_ROGER_REPORT]
+        reported = [hound for hound, step in self.fox_streams if step == QSO_REPORT]
+        for hound in finished:
+            self.finish_hound(hound)
+
+        waiting = self.waiting_hounds()
+        rng.shuffle(waiting)
+        new_hounds = waiting[:max(0, max_streams - len(reported))]
+        self.fox_streams = [(hound, QSO_REPORT) for hound in reported + new_hounds]
+
+        if superfox:
+            hashed = f"<{dx.callsign}>"
+            for hound in finished:
+                decodes.append(self.decode(dx, f"{hound.callsign} {hashed} RR73"))
+            for hound in new_hounds:
+                decodes.append(self.decode(dx, f"{hound.callsign} {hashed} {format_report(rng)}"))
+            if not decodes:
+                decodes.append(self.decode(dx, f"CQ {hashed} {dx.grid}"))
+            return decodes
+
+        # Chaque message combine un RR73 et un nouveau report
+        messages = []
+        pending_reports = list(new_hounds)
+        for hound in finished:
+            if pending_reports:
+                new_hound = pending_reports.pop(0)
+                messages.append(f"{hound.callsign} RR73; {new_hound.callsign} <{dx.callsign}> {format_report(rng)}")
+            else:
+                messages.append(f"{hound.callsign} {dx.callsign} RR73")
+        for hound in pending_reports:
+            messages.append(f"{hound.callsign} {dx.callsign} {format_report(rng)}")
+        if not messages:
+            messages.append(f"CQ {dx.callsign} {dx.grid}")
+
+        for index, message in enumerate(messages[:max_streams]):
+            snr, dt, hz, text = self.decode(dx, message)
+            # Un flux toutes les 60 Hz à partir de la fréquence du Fox
+            decodes.append((snr, dt, dx.hz + index * 60, text))
+        return decodes
+
+def format_jtdx_line(time_str, decode):
+    snr, dt, hz, message = decode
+    return f"{time_str} {snr:3d} {dt:4.1f} {hz:4d} ~ {message}\n"
+
+def format_wsjt_line(time_str, decode, dial_frequency_mhz):
+    snr, dt, hz, message = decode
+    return f"{time_str} {dial_frequency_mhz:10.3f} Rx FT8 {snr:6d} {dt:4.1f} {hz:4d} {message}\n"
+
+def generate(
+        band,
+        start,
+        slots_per_day,
+        days=1,
+        growth=0.0,
+        instance_type="JTDX",
+        dial_frequency=14074000,
+        write=None,
+        send=None,
+        speed=0,
+        max_bytes=None
+    ):
+    # Séquences successives à partir de start, chaque jour avec une activité
+    # multipliée par (1 + growth)
+    time_format = '%Y%m%d_%H%M%S' if instance_type == "JTDX" else '%y%m%d_%H%M%S'
+    dial_frequency_mhz = dial_frequency / 1e6
+    totals = {'slots': 0, 'lines': 0, 'bytes': 0}
+
+    wall_start = time.perf_counter()
+    for day in range(days):
+        activity = (1 + growth) ** day
+        day_start = start + datetime.timedelta(days=day)
+
+        for index in range(slots_per_day):
+            moment = day_start + datetime.timedelta(seconds=index * slot_duration)
+            decodes = band.next_slot(slot_parity(moment), activity)
+
+            if speed > 0:
+                # Rythme des séquences divisé par la vitesse demandée
+                delay = wall_start + (totals['slots'] * slot_duration) / speed - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            if write is not None:
+                time_str = moment.strftime(time_format)
+                if instance_type == "JTDX":
+                    chunk = "".join(format_jtdx_line(time_str, decode) for decode in decodes)
+                else:
+                    chunk = "".join(format_wsjt_line(time_str, decode, dial_frequency_mhz) for decode in decodes)
+                write(chunk)
+                totals['bytes'] += len(chunk)
+
+            if send is not None:
+                sent_bytes = send(moment, decodes)
+                if write is None:
+                    # Sans fichier, la taille limite porte sur les datagrammes envoyés
+                    totals['bytes'] += sent_bytes
+
+            totals['slots'] += 1
+            totals['lines'] += len(decodes)
+
+            if max_bytes is not None and totals['bytes'] >= max_bytes:
+                return totals
+
+    return totals
+
+class DecodeSender:
+    # Envoi des décodages sous forme de messages UDP Decode de WSJT-X
+    def __init__(self, host, port, client_id="WSJT-X", dial_frequency=14074000, your_callsign=None):
+        self.address = (host, port)
+        self.client_id = client_id
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.sendto(encode_message(Heartbeat(client_id, 3, "2.7.0", "generator")), self.address)
+        self.sock.sendto(encode_message(Status(client_id, dial_frequency, "FT8", de_call=your_callsign or "")), self.address)
+        self.sent = 0
+
+    def send(self, moment, decodes):
+        milliseconds = milliseconds_since_midnight(moment)
+        sent_bytes = 0
+        for snr, dt, hz, message in decodes:
+            packet = encode_message(Decode(self.client_id, True, milliseconds, snr, dt, hz, "~", message))
+            self.sock.sendto(packet, self.address)
+            self.sent += 1
+            sent_bytes += len(packet)
+        return sent_bytes
+
+    def close(self):
+        self.sock.close()
+
+def parse_size(text):
+    units = {'K': 1024, 'M': 1024 ** 2, 'G': 1024 ** 3}
+    text = text.strip().upper()
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+def main():
+    parser = argparse.ArgumentParser(description="Activité FT8 synthétique au format ALL.TXT (JTDX ou WSJT-X) ou UDP")
+    parser.add_argument("--output", help="Fichier ALL.TXT complété (sortie standard si absent et sans --udp)")
+    parser.add_argument("--instance", default="JTDX", choices=["JTDX", "WSJT"], help="Format des lignes")
+    parser.add_argument("--udp", help="Envoi de messages Decode vers host:port")
+    parser.add_argument("--stations", type=int, default=500, help="Nombre de stations actives")
+    parser.add_argument("--decodes", type=int, default=40, help="Décodages par séquence (400+ en contest)")
+    parser.add_argument("--cq-ratio", type=float, default=0.3, help="Proportion de CQ parmi les nouveaux messages")
+    parser.add_argument("--dx", help="Indicatif du DX recherché")
+    parser.add_argument("--pileup", type=int, default=0, help="Nombre de stations appelant le DX")
+    parser.add_argument("--dx-mode", default="Normal", choices=["Normal", "Fox/Hound", "SuperFox"], help="Mode du DX")
+    parser.add_argument("--your-callsign", help="Votre indicatif, placé dans le pileup")
+    parser.add_argument("--snr", type=float, nargs=2, default=(default_snr_mean, default_snr_deviation), metavar=("MOYENNE", "ECART"), help="Distribution des SNR (dB)")
+    parser.add_argument("--dt", type=float, nargs=2, default=(default_dt_mean, default_dt_deviation), metavar=("MOYENNE", "ECART"), help="Distribution des DT (s)")
+    parser.add_argument("--miss-ratio", type=float, default=default_miss_ratio, help="Proportion de messages non décodés")
+    parser.add_argument("--start", help="Début UTC (AAAA-MM-JJ HH:MM:SS), par défaut pour finir à l'heure actuelle")
+    parser.add_argument("--minutes", type=float, default=60, help="Durée d'activité par jour en minutes")
+    parser.add_argument("--days", type=int, default=1, help="Nombre de jours")
+    parser.add_argument("--growth", type=float, default=0.0, help="Croissance de l'activité d'un jour à l'autre (0.2 = +20%%)")
+    parser.add_argument("--dial-frequency", type=int, default=14074000, help="Fréquence affichée (Hz)")
+    parser.add_argument("--max-size", help="Arrêt à la taille indiquée (ex: 500M, 2G), datagrammes compris avec --udp sans --output")
+    parser.add_argument("--speed", type=float, default=0, help="Vitesse (1 = temps réel, 0 = au plus vite)")
+    parser.add_argument("--seed", type=int, default=0, help="Graine du générateur aléatoire")
+    args = parser.parse_args()
+
+    slots_per_day = max(1, int(args.minutes * 60 // slot_duration))
+    if args.start:
+        start = datetime.datetime.strptime(args.start, "%Y-%m-%d %H:%M:%S").replace(tzinfo=utc)
+    else:
+        now = datetime.datetime.now(utc).replace(microsecond=0)
+        now -= datetime.timedelta(seconds=now.second % slot_duration)
+        start = now - datetime.timedelta(days=args.days - 1, seconds=(slots_per_day - 1) * slot_duration)
+    start -= datetime.timedelta(seconds=start.second % slot_duration)
+
+    band = BandActivity(
+        args.stations,
+        args.decodes,
+        args.cq_ratio,
+        args.dx.upper() if args.dx else None,
+        args.pileup,
+        args.dx_mode,
+        args.your_callsign.upper() if args.your_callsign else None,
+        args.snr[0],
+        args.snr[1],
+        args.dt[0],
+        args.dt[1],
+        args.miss_ratio,
+        args.seed
+    )
+
+    output = None
+    write = None
+    if args.output:
+        output = open(args.output, 'a', encoding='utf-8', buffering=1024 * 1024)
+        write = output.write
+    elif not args.udp:
+        write = sys.stdout.write
+
+    sender = None
+    if args.udp:
+        host, _, port = args.udp.partition(':')
+        sender = DecodeSender(host, int(port) if port else default_udp_port, dial_frequency=args.dial_frequency, your_callsign=args.your_callsign)
+
+    wall_start = time.perf_counter()
+    try:
+        totals = generate(
+            band,
+            start,
+            slots_per_day,
+            args.days,
+            args.growth,
+            args.instance,
+            args.dial_frequency,
+            write,
+            sender.send if sender is not None else None,
+            args.speed,
+            parse_size(args.max_size) if args.max_size else None
+        )
+    finally:
+        if output is not None:
+            output.close()
+        if sender is not None:
+            sender.close()
+    duration = time.perf_counter() - wall_start
+
+    summary = (
+        f"{totals['slots']:,} séquences, {totals['lines']:,} décodages "
+        f"({totals['lines'] / max(totals['slots'], 1):.0f} par séquence), {totals['bytes'] / 1024 ** 2:,.1f} Mo "
+        f"en {duration:.2f}s ({totals['lines'] / max(duration, 1e-9):,.0f} lignes/s)"
+    )
+    if band.dx is not None:
+        summary += f", {len(band.worked)} station(s) contactée(s) par {band.dx.callsign}"
+    print(summary, file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+import os
+import sys
+import time
+import argparse
+import datetime
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clock_service import get_clock
+from gui_automation import AutomationError
+from log_analysis import EVEN, ODD
+from slot_clock import period_at
+
+# Instances JTDX et WSJT-X simulées en mémoire pour wait_and_pounce: état des widgets
+# (Enable TX, période d'émission, champ DX Call, fréquence) et latence de chaque action,
+# pour exécuter la boucle de monitor_file sans Windows
+
+utc = datetime.timezone.utc
+
+# Couleurs affichées par les widgets
+jtdx_color_even = (162, 229, 235)
+jtdx_color_odd = (241, 249, 216)
+jtdx_color_tx_enabled = (255, 60, 60)
+jtdx_color_tx_disabled = (220, 220, 220)
+wsjt_color_dx_call_enabled = (255, 0, 0)
+wsjt_color_dx_call_disabled = (255, 255, 0)
+background_color = (240, 240, 240)
+
+# Positions des widgets cliqués par wait_and_pounce
+jtdx_widgets = {
+    (610, 855): 'enable_tx',
+    (680, 850): 'halt_tx',
+    (1015, 150): 'tx_period',
+    (625, 235): 'dx_call',
+    (615, 190): 'frequency',
+    (770, 840): 'generate_messages',
+}
+wsjt_widgets = {
+    (640, 750): 'enable_tx',
+    (690, 775): 'dx_call',
+    (1200, 720): 'generate_messages',
+    (215, 380): 'log_qso',
+}
+
+# Champs de saisie
+input_fields = ('dx_call', 'frequency')
+
+# Latence simulée de chaque type d'action, en secondes
+default_latencies = {
+    'window': 0.0,
+    'pixel': 0.0,
+    'click': 0.0,
+    'key': 0.0,
+    'clipboard': 0.0,
+}
+
+class FakeWindow:
+    __slots__ = ('title', 'x', 'y', 'width', 'height', 'minimized')
+
+    def __init__(self, title):
+        self.title = title
+        self.x = 0
+        self.y = 0
+        self.width = 0
+        self.height = 0
+        self.minimized = True
+
+class FakeInstance:
+    # Etat des widgets d'une instance, modifié par les clics et la saisie
+    def __init__(self, instance_type, window_title, tx_period=EVEN, frequency=""):
+        self.instance_type = instance_type
+        self.window = FakeWindow(window_title)
+        self.widgets = jtdx_widgets if instance_type == 'JTDX' else wsjt_widgets
+        self.tx_enabled = False
+        self.tx_period = tx_period
+        self.fields = {'dx_call': "", 'frequency': frequency}
+        self.frequency = frequency
+        self.generated_call = None
+        self.logged_qsos = []
+        self.history = []
+
+    def pixel(self, widget):
+        if widget == 'tx_period':
+            return jtdx_color_even if self.tx_period == EVEN else jtdx_color_odd
+        if widget == 'enable_tx':
+            if self.instance_type == 'JTDX':
+                return jtdx_color_tx_enabled if self.tx_enabled else jtdx_color_tx_disabled
+            return wsjt_color_dx_call_enabled if self.tx_enabled else wsjt_color_dx_call_disabled
+        return background_color
+
+    def click(self, widget, button):
+        if widget == 'enable_tx':
+            # Clic droit sur le bouton DX Call de WSJT-X: désactivation
+            self.tx_enabled = button != 'right'
+        elif widget == 'halt_tx':
+            self.tx_enabled = False
+        elif widget == 'tx_period':
+            self.tx_period = ODD if self.tx_period == EVEN else EVEN
+        elif widget == 'generate_messages':
+            self.generated_call = self.fields['dx_call']
+        elif widget == 'log_qso':
+            self.logged_qsos.append(self.fields['dx_call'])
+        self.history.append((widget, button))
+
+class FakeAutomation:
+    # Même interface que DesktopAutomation, sans écran ni clavier
+    def __init__(self, latencies=None, clock=None):
+        self.latencies = dict(default_latencies)
+        if latencies:
+            self.latencies.update(latencies)
+        # Latences à charge de l'horloge commune: avec une VirtualClock, le temps simulé avance
+        self.clock = clock if clock is not None else get_clock()
+
+        self.instances = {}
+        self.foreground = None
+        self.focus = None
+        self.selected = False
+        self.clipboard = ""
+        self.lock = threading.Lock()
+
+        self.counts = {action: 0 for action in default_latencies}
+        self.charged = 0.0
+
+    def add_instance(self, window_title, instance_type, tx_period=EVEN, frequency=""):
+        instance = FakeInstance(instance_type, window_title, tx_period, frequency)
+        self.instances[window_title] = instance
+        return instance
+
+    def charge(self, action):
+        latency = self.latencies.get(action, 0.0)
+        with self.lock:
+            self.counts[action] += 1
+            self.charged += latency
+        if latency > 0:
+            self.clock.sleep(latency)
+
+    def widget_at(self, x, y):
+        if self.foreground is None:
+            return None
+        return self.foreground.widgets.get((x, y))
+
+    def find_window(self, window_title):
+        self.charge('window')
+        instance = self.instances.get(window_title)
+        return instance.window if instance is not None else None
+
+    def is_foreground(self, window):
+        return self.foreground is not None and self.foreground.window is window
+
+    def restore_window(self, window):
+        self.charge('window')
+        window.minimized = False
+
+    def raise_window(self, window):
+        self.charge('window')
+        with self.lock:
+            self.foreground = self.instances[window.title]
+            self.focus = None
+            self.selected = False
+
+    def move_window(self, window, x, y, width, height):
+        self.charge('window')
+        window.x, window.y, window.width, window.height = x, y, width, height
+
+    def move_to(self, x, y):
+        pass
+
+    def pixel(self, x, y):
+        self.charge('pixel')
+        if self.foreground is None:
+            raise AutomationError(f"Aucune fenêtre au premier plan pour lire le pixel ({x}, {y})")
+        return self.foreground.pixel(self.widget_at(x, y))
+
+    def click(self, x, y, button='left'):
+        self.charge('click')
+        with self.lock:
+            widget = self.widget_at(x, y)
+            if widget is None:
+                return
+            self.focus = widget if widget in input_fields else None
+            self.selected = False
+            self.foreground.click(widget, button)
+
+    def hotkey(self, *keys):
+        self.charge('key')
+        with self.lock:
+            if self.focus is None:
+                return
+            if keys == ('ctrl', 'a'):
+                self.selected = True
+            elif keys == ('ctrl', 'c') and self.selected:
+                self.clipboard = self.foreground.fields[self.focus]
+
+    def press(self, key):
+        self.charge('key')
+        with self.lock:
+            if self.focus is None:
+                return
+            fields = self.foreground.fields
+            if key == 'delete':
+                if self.selected:
+                    fields[self.focus] = ""
+                    self.selected = False
+            elif key == 'enter' and self.focus == 'frequency':
+                # Validation du champ fréquence: QSY de l'instance
+                self.foreground.frequency = fields['frequency']
+                self.foreground.history.append(('frequency', fields['frequency']))
+
+    def typewrite(self, text):
+        self.charge('key')
+        with self.lock:
+            if self.focus is None:
+                return
+            fields = self.foreground.fields
+            fields[self.focus] = ("" if self.selected else fields[self.focus]) + text
+            self.selected = False
+
+    def paste(self):
+        self.charge('clipboard')
+        return self.clipboard
+
+def decode_line(timestamp, message, snr=-8, dt=0.1, frequency=1500):
+    # Ligne de décodage au format ALL.TXT de JTDX
+    return f"{time.strftime('%Y%m%d_%H%M%S', time.gmtime(timestamp))} {snr:3d} {dt:4.1f} {frequency:4d} ~ {message}\n"
+
+def check(latency, timeout=20):
+    # Boucle complète de monitor_file: le moteur doit sélectionner l'indicatif,
+    # se placer sur la période opposée et activer l'émission
+    import wait_and_pounce
+
+    your_callsign = "F5UKW"
+    wanted_callsign = "K1ABC"
+    window_title = "JTDX - simulation"
+
+    wait_and_pounce.wait_time = 0.01
+    gui = FakeAutomation({action: latency for action in default_latencies})
+    instance = gui.add_instance(window_title, 'JTDX')
+    wait_and_pounce.set_automation_backend(gui)
+
+    directory = tempfile.mkdtemp()
+    file_path = os.path.join(directory, "ALL.TXT")
+    with open(file_path, 'w', encoding='utf-8') as file:
+        file.write(decode_line(time.time() - 60, "CQ DL2ZZ JO31"))
+
+    stop_event = threading.Event()
+    monitor = threading.Thread(
+        target=wait_and_pounce.monitor_file,
+        args=(file_path, window_title, 'JTDX', lambda tracking: None, None, None,
+              your_callsign, [wanted_callsign], "Normal", stop_event),
+        daemon=True
+    )
+    monitor.start()
+
+    # Décodage écrit au début de la séquence suivante, postérieur au démarrage du monitoring
+    now = time.time()
+    slot_start = now - now % 15 + 15
+    print(f"Attente de la séquence suivante ({slot_start - now:.1f}s)")
+    time.sleep(slot_start - now)
+    expected_period = ODD if period_at(datetime.datetime.fromtimestamp(slot_start, utc)) == EVEN else EVEN
+    start = time.perf_counter()
+    with open(file_path, 'a', encoding='utf-8') as file:
+        file.write(decode_line(slot_start, f"CQ {wanted_callsign} FN42"))
+
+    while not instance.tx_enabled and time.perf_counter() - start < timeout:
+        time.sleep(0.01)
+    duration = time.perf_counter() - start
+
+    stop_event.set()
+    monitor.join(timeout)
+
+    errors = []
+    if instance.fields['dx_call'] != wanted_callsign:
+        errors.append(f"DX Call '{instance.fields['dx_call']}' au lieu de {wanted_callsign}")
+    if instance.generated_call != wanted_callsign:
+        errors.append(f"Messages générés pour {instance.generated_call}")
+    if instance.tx_period != expected_period:
+        errors.append(f"Période {instance.tx_period} au lieu de {expected_period}")
+    if not instance.tx_enabled:
+        errors.append("Enable TX inactif")
+
+    print(f"Actions simulées: {gui.counts}, latence simulée cumulée {gui.charged:.3f}s")
+    print(f"Décodage -> Enable TX actif: {duration * 1000:.1f} ms")
+    return errors
+
+def main():
+    parser = argparse.ArgumentParser(description="Instance JTDX simulée pour wait_and_pounce sans Windows")
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence simulée de chaque action (s)")
+    args = parser.parse_args()
+
+    errors = check(args.latency)
+    for error in errors:
+        print(f"Echec: {error}")
+    if errors:
+        sys.exit(1)
+    print("Succès")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+import os
+import sys
+import time
+import argparse
+import threading
+import socketserver
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pounce_engine import ACTION_QSY, ActionIntent
+from rig_control import CatControlBackend, RigctldClient, default_rigctld_port
+
+# Simulation de rigctld (Hamlib) pour le backend CAT: fréquence en mémoire,
+# commandes F / f / q et leurs formes longues \set_freq / \get_freq
+
+class MockRig:
+    def __init__(self, frequency=14074000, delay=0.0, offset=0):
+        self.frequency = frequency
+        # Temps de réponse simulé du transceiver, en secondes
+        self.delay = delay
+        # Décalage appliqué à la fréquence enregistrée pour simuler un refus partiel
+        self.offset = offset
+        self.commands = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def execute(self, line):
+        parts = line.split()
+        if not parts:
+            return None
+
+        with self.lock:
+            self.commands += 1
+            if self.delay:
+                time.sleep(self.delay)
+
+            command = parts[0]
+            if command in ("F", "\\set_freq"):
+                try:
+                    self.frequency = int(float(parts[1])) + self.offset
+                except (IndexError, ValueError):
+                    return "RPRT -1"
+                return "RPRT 0"
+            elif command in ("f", "\\get_freq"):
+                return str(self.frequency)
+            elif command in ("q", "Q"):
+                return False
+
+        # Commande non implémentée
+        return "RPRT -11"
+
+class RigctldHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        rig = self.server.rig
+        rig.connections += 1
+        for raw_line in self.rfile:
+            response = rig.execute(raw_line.decode('ascii', 'replace').strip())
+            if response is False:
+                break
+            if response is not None:
+                self.wfile.write(response.encode('ascii') + b"\n")
+
+class MockRigctldServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, address, rig):
+        self.rig = rig
+        super().__init__(address, RigctldHandler)
+
+def check(port, repeat):
+    # Vérification du backend CAT contre le simulateur, et durée des changements de fréquence
+    rig = MockRig()
+    server = MockRigctldServer(('127.0.0.1', port), rig)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    failures = 0
+    client = RigctldClient('127.0.0.1', port)
+    backend = CatControlBackend(client)
+
+    frequencies = [7074, 10136, 14074, 18100, 21074, 24915, 28074]
+    durations = []
+    for index in range(repeat):
+        frequency = frequencies[index % len(frequencies)]
+        start = time.perf_counter()
+        if backend.handle(ActionIntent(ACTION_QSY, frequency=frequency)) is not True:
+            failures += 1
+        durations.append(time.perf_counter() - start)
+        if rig.frequency != frequency * 1000:
+            failures += 1
+
+    if rig.connections != 1:
+        print(f"ERREUR {rig.connections} connexions au lieu d'une connexion persistante")
+        failures += 1
+
+    # Reconnexion après la perte de la connexion
+    client.sock.close()
+    if backend.qsy(7074) is not True:
+        print("ERREUR pas de reconnexion")
+        failures += 1
+
+    # Une relecture différente de la fréquence demandée est un échec
+    rig.offset = 500
+    if backend.qsy(14074) is not False:
+        print("ERREUR fréquence relue différente acceptée")
+        failures += 1
+    rig.offset = 0
+
+    backend.close()
+    server.shutdown()
+    server.server_close()
+
+    durations.sort()
+    print(f"Changement de fréquence CAT: médiane {durations[len(durations) // 2] * 1000:.3f} ms, max {durations[-1] * 1000:.3f} ms")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulateur rigctld (Hamlib) pour le backend CAT")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse d'écoute")
+    parser.add_argument("--port", type=int, default=default_rigctld_port, help="Port d'écoute")
+    parser.add_argument("--frequency", type=int, default=14074000, help="Fréquence initiale en Hz")
+    parser.add_argument("--delay", type=float, default=0.0, help="Temps de réponse simulé en secondes")
+    parser.add_argument("--check", action="store_true", help="Vérifie le backend CAT contre le simulateur puis s'arrête")
+    parser.add_argument("--repeat", type=int, default=100, help="Nombre de changements de fréquence pour --check")
+    args = parser.parse_args()
+
+    if args.check:
+        failures = check(args.port, args.repeat)
+        print("Succès" if failures == 0 else f"{failures} erreur(s)")
+        sys.exit(1 if failures else 0)
+
+    server = MockRigctldServer((args.host, args.port), MockRig(args.frequency, args.delay))
+    print(f"rigctld simulé sur {args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    server.server_close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+import io
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clock_service import VirtualClock
+from decode_record import parse_decode_line
+from pounce_engine import (
+    ACTION_PREPARE,
+    PounceEngine
+)
+from slot_clock import SlotClock
+
+# Rejeu déterministe d'un ALL.TXT (JTDX ou WSJT-X) dans le moteur de décision:
+# horloge virtuelle, actions enregistrées au lieu d'être exécutées,
+# et chronologie des décisions en sortie
+
+# Délai entre le début d'une séquence et l'écriture de ses décodages
+default_decode_delay = 13.0
+
+class RecordingBackend:
+    # Backend factice: chaque intention est horodatée en temps virtuel
+    def __init__(self, clock):
+        self.clock = clock
+        self.timeline = []
+        self.source_line = None
+
+    def handle(self, intent):
+        self.timeline.append({
+            'time': self.clock.time(),
+            'action': intent.action,
+            'callsign': intent.callsign,
+            'period': intent.period,
+            'frequency': intent.frequency,
+            'not_before': intent.not_before,
+            'deadline': intent.deadline,
+            'record': intent.record.line if intent.record is not None else None,
+            'source': self.source_line,
+        })
+        # La préparation initiale doit réussir pour démarrer le moteur
+        if intent.action == ACTION_PREPARE:
+            return True
+        return None
+
+def read_batches(file_path):
+    # Décodages regroupés par séquence, comme JTDX et WSJT-X les écrivent
+    batches = []
+    current_time_str = None
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+        for line in file:
+            record = parse_decode_line(line)
+            if record is None:
+                continue
+            if record.log_time_str != current_time_str:
+                batches.append((record.log_time, []))
+                current_time_str = record.log_time_str
+            batches[-1][1].append(line)
+    return batches
+
+def run_simulation(
+        batches,
+        instance_type,
+        your_callsign,
+        wanted_callsigns_list,
+        instance_mode="Normal",
+        frequency_hopping=None,
+        time_hopping=None,
+        speed=0,
+        decode_delay=default_decode_delay,
+        verbose=False
+    ):
+    if not batches:
+        return [], {}
+
+    clock = VirtualClock(batches[0][0].timestamp() - 1)
+    backend = RecordingBackend(clock)
+    engine = PounceEngine(
+        instance_type,
+        your_callsign,
+        wanted_callsigns_list,
+        instance_mode,
+        list(frequency_hopping) if frequency_hopping else None,
+        time_hopping,
+        slot_clock=SlotClock(time_source=clock.time),
+        clock=clock
+    )
+    engine.subscribe(backend.handle)
+
+    # Les messages du moteur sont ignorés sauf en mode verbeux
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+
+    analysis_durations = []
+    line_count = 0
+    start = time.perf_counter()
+
+    with output:
+        engine.start()
+
+        for log_time, lines in batches:
+            arrival_time = log_time.timestamp() + decode_delay
+
+            if speed > 0:
+                # Rejeu à la vitesse demandée: attente réelle de l'écart virtuel divisé par speed
+                wall_target = start + (arrival_time - batches[0][0].timestamp()) / speed
+                delay = wall_target - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+
+            clock.advance_to(arrival_time)
+            backend.source_line = lines[-1].strip()
+
+            analysis_start = time.perf_counter()
+            engine.process_lines(lines, arrival_time)
+            engine.check_frequency_hopping()
+            analysis_durations.append(time.perf_counter() - analysis_start)
+
+            line_count += len(lines)
+            if engine.finished:
+                break
+
+    duration = time.perf_counter() - start
+    analysis_durations.sort()
+    summary = {
+        'lines': line_count,
+        'batches': len(analysis_durations),
+        'decisions': len(backend.timeline),
+        'virtual_seconds': clock.time() - batches[0][0].timestamp(),
+        'wall_seconds': duration,
+        'lines_per_second': line_count / duration if duration > 0 else None,
+        'analysis_p50': analysis_durations[len(analysis_durations) // 2] if analysis_durations else None,
+        'analysis_p99': analysis_durations[int(len(analysis_durations) * 0.99)] if analysis_durations else None,
+        'finished': engine.finished,
+    }
+    return backend.timeline, summary
+
+def format_time(timestamp):
+    return time.strftime('%H:%M:%S', time.gmtime(timestamp)) + f".{int(timestamp * 1000) % 1000:03d}" if timestamp is not None else "-"
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejeu déterministe d'un ALL.TXT dans le moteur de décision")
+    parser.add_argument("file", help="Fichier ALL.TXT (JTDX ou WSJT-X) à rejouer")
+    parser.add_argument("--your-callsign", required=True, help="Votre indicatif")
+    parser.add_argument("--wanted", required=True, help="Indicatif(s) recherché(s), séparés par des virgules")
+    parser.add_argument("--instance", default="JTDX", choices=["JTDX", "WSJT"], help="Type d'instance")
+    parser.add_argument("--mode", default="Normal", choices=["Normal", "Fox/Hound", "SuperFox"], help="Mode de l'instance")
+    parser.add_argument("--frequencies", help="Fréquences (kHz) du frequency hopping, séparées par des virgules")
+    parser.add_argument("--time-hopping", type=float, help="Durée en minutes sur chaque fréquence")
+    parser.add_argument("--speed", type=float, default=0, help="Vitesse de rejeu (1 = temps réel, 10 = 10x, 0 = au plus vite)")
+    parser.add_argument("--decode-delay", type=float, default=default_decode_delay, help="Secondes entre le début d'une séquence et ses décodages")
+    parser.add_argument("--output", help="Chronologie enregistrée en JSON")
+    parser.add_argument("--verbose", action="store_true", help="Afficher les messages du moteur")
+    args = parser.parse_args()
+
+    wanted_callsigns_list = [call for call in args.wanted.upper().split(",") if len(call) >= 3]
+    frequency_hopping = [int(frequency) for frequency in args.frequencies.split(",")] if args.frequencies else None
+
+    batches = read_batches(args.file)
+    timeline, summary = run_simulation(
+        batches,
+        args.instance,
+        args.your_callsign.upper(),
+        wanted_callsigns_list,
+        args.mode,
+        frequency_hopping,
+        args.time_hopping,
+        args.speed,
+        args.decode_delay,
+        args.verbose
+    )
+
+    for event in timeline:
+        details = []
+        if event['callsign']:
+            details.append(event['callsign'])
+        if event['period']:
+            details.append(event['period'])
+        if event['frequency']:
+            details.append(f"{event['frequency']} kHz")
+        if event['not_before'] is not None:
+            details.append(f"fenêtre {format_time(event['not_before'])} -> {format_time(event['deadline'])}")
+        print(f"{format_time(event['time'])} {event['action']:<14} {' '.join(details)}")
+        if event['record']:
+            print(f"{'':13}<- {event['record']}")
+
+    if summary:
+        print(
+            f"\n{summary['lines']:,} lignes, {summary['batches']:,} séquences, {summary['decisions']} décision(s) "
+            f"en {summary['wall_seconds']:.3f}s pour {summary['virtual_seconds']:.0f}s simulées "
+            f"({summary['lines_per_second']:,.0f} lignes/s, analyse p50 {summary['analysis_p50'] * 1000:.3f} ms, "
+            f"p99 {summary['analysis_p99'] * 1000:.3f} ms)"
+        )
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump({'summary': summary, 'timeline': timeline}, file, indent=2)
+
+if __name__ == "__main__":
+    main()
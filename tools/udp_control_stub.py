@@ -0,0 +1,182 @@
+import os
+import sys
+import time
+import socket
+import struct
+import argparse
+import datetime
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pounce_engine import PounceEngine
+from udp_control import UdpControlBackend
+from udp_listener import UdpDecodeListener
+from wsjtx_protocol import (
+    Decode,
+    Heartbeat,
+    Status,
+    encode_message,
+    milliseconds_since_midnight
+)
+
+# Instance WSJT-X simulée: envoie des décodages et vérifie octet par octet
+# les commandes reçues en retour, ainsi que le délai entre décodage et commande
+
+utc = datetime.timezone.utc
+
+client_id = "WSJT-X"
+your_callsign = "F5UKW"
+
+def qstring(text):
+    # Sérialisation QByteArray écrite à la main, indépendante de wsjtx_protocol
+    encoded = text.encode('utf-8')
+    return struct.pack('>I', len(encoded)) + encoded
+
+def header(message_type):
+    return struct.pack('>III', 0xadbccbda, 2, message_type) + qstring(client_id)
+
+def expected_configure(dx_call):
+    return (
+        header(15)
+        + qstring("")
+        + struct.pack('>I', 0xffffffff)
+        + qstring("")
+        + struct.pack('>B', 0)
+        + struct.pack('>II', 0xffffffff, 0xffffffff)
+        + qstring(dx_call)
+        + qstring("")
+        + struct.pack('>B', 1)
+    )
+
+def expected_reply(time_ms, snr, delta_time, delta_frequency, mode, message):
+    return (
+        header(4)
+        + struct.pack('>Iid', time_ms, snr, delta_time)
+        + struct.pack('>I', delta_frequency)
+        + qstring(mode)
+        + qstring(message)
+        + struct.pack('>BB', 0, 0)
+    )
+
+def expected_halt_tx(auto_tx_only):
+    return header(8) + struct.pack('>B', 1 if auto_tx_only else 0)
+
+def expected_free_text(text, send):
+    return header(9) + qstring(text) + struct.pack('>B', 1 if send else 0)
+
+class StubInstance:
+    def __init__(self, server_address):
+        self.server_address = server_address
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.settimeout(2)
+
+    def send(self, packet):
+        self.sock.sendto(packet, self.server_address)
+
+    def send_status(self, dx_call="", tx_enabled=False):
+        self.send(encode_message(Status(client_id, 14074000, "FT8", dx_call, tx_enabled=tx_enabled, de_call=your_callsign)))
+
+    def receive(self):
+        try:
+            data, _ = self.sock.recvfrom(65535)
+        except socket.timeout:
+            return None
+        return data
+
+def run_engine(engine, listener, stop_event):
+    while not stop_event.is_set():
+        records = listener.read_new_records(0.1)
+        if records:
+            engine.process_records(records)
+
+def next_second():
+    now = datetime.datetime.now(utc)
+    return now.replace(microsecond=0) + datetime.timedelta(seconds=1)
+
+def main():
+    parser = argparse.ArgumentParser(description="Stub UDP d'une instance WSJT-X pour le backend de pilotage UDP")
+    parser.add_argument("--port", type=int, default=22237, help="Port d'écoute de wait_and_pounce")
+    parser.add_argument("--repeat", type=int, default=200, help="Nombre de mesures de latence")
+    args = parser.parse_args()
+
+    listener = UdpDecodeListener('127.0.0.1', args.port)
+    stub = StubInstance(('127.0.0.1', args.port))
+
+    stub.send(encode_message(Heartbeat(client_id, 3, "2.7.0", "stub")))
+    stub.send_status()
+    listener.wait_for_client(2)
+
+    engine = PounceEngine('JTDX', your_callsign, ['K1ABC', 'DL*'], instance_state=listener.state)
+    backend = UdpControlBackend(listener, your_callsign)
+    engine.subscribe(backend.handle)
+    engine.start()
+
+    stop_event = threading.Event()
+    engine_thread = threading.Thread(target=run_engine, args=(engine, listener, stop_event))
+    engine_thread.start()
+
+    failures = 0
+
+    def check(name, received, expected):
+        nonlocal failures
+        if received == expected:
+            print(f"OK     {name} ({len(received) if received is not None else 0} octets)")
+        else:
+            failures += 1
+            print(f"ERREUR {name}\n  reçu:    {received!r}\n  attendu: {expected!r}")
+
+    try:
+        # CQ du DX: Configure (DX Call) puis Reply
+        moment = next_second()
+        stub.send(encode_message(Decode(client_id, True, milliseconds_since_midnight(moment), -10, 0.2, 1500, "~", "CQ K1ABC FN42")))
+        check("Configure", stub.receive(), expected_configure("K1ABC"))
+        check("Reply", stub.receive(), expected_reply(milliseconds_since_midnight(moment), -10, 0.2, 1500, "~", "CQ K1ABC FN42"))
+
+        # L'instance émet: aucun nouveau Reply tant que le Status indique TX actif
+        stub.send_status("K1ABC", True)
+        moment = next_second()
+        stub.send(encode_message(Decode(client_id, True, milliseconds_since_midnight(moment) + 1000, -8, 0.1, 1500, "~", "F5UKW K1ABC -05")))
+        check("Pas de Reply (TX actif)", stub.receive(), None)
+
+        # Fin du QSO: HaltTx
+        moment = next_second()
+        stub.send(encode_message(Decode(client_id, True, milliseconds_since_midnight(moment) + 2000, -8, 0.1, 1500, "~", "F5UKW K1ABC 73")))
+        check("HaltTx", stub.receive(), expected_halt_tx(False))
+
+        backend.send_free_text("TNX 73", True)
+        check("FreeText", stub.receive(), expected_free_text("TNX 73", True))
+
+        # Latence aller-retour: décodage envoyé -> Reply reçu
+        stub.send_status()
+        latencies = []
+        for index in range(args.repeat):
+            callsign = f"DL{index}XX"
+            moment = next_second()
+            decode = Decode(client_id, True, milliseconds_since_midnight(moment), -10, 0.2, 1500, "~", f"CQ {callsign} JN58")
+            start = time.perf_counter()
+            stub.send(encode_message(decode))
+            configure = stub.receive()
+            reply = stub.receive()
+            latencies.append(time.perf_counter() - start)
+            if configure != expected_configure(callsign) or reply != expected_reply(decode.time, -10, 0.2, 1500, "~", decode.message):
+                failures += 1
+
+            # Fin du QSO pour passer à l'indicatif suivant
+            stub.send(encode_message(Decode(client_id, True, decode.time + 1000, -10, 0.2, 1500, "~", f"{your_callsign} {callsign} 73")))
+            if stub.receive() != expected_halt_tx(False):
+                failures += 1
+    finally:
+        stop_event.set()
+        engine_thread.join()
+        listener.close()
+
+    latencies.sort()
+    if latencies:
+        print(f"Latence décodage -> Reply: médiane {latencies[len(latencies) // 2] * 1000:.3f} ms, p95 {latencies[int(len(latencies) * 0.95)] * 1000:.3f} ms, max {latencies[-1] * 1000:.3f} ms")
+    print("Succès" if failures == 0 else f"{failures} erreur(s)")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import os
+import sys
+import time
+import socket
+import argparse
+import datetime
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from decode_record import parse_decode_line
+from udp_listener import UdpDecodeListener, default_udp_port
+from wsjtx_protocol import (
+    Decode,
+    Heartbeat,
+    Status,
+    encode_message,
+    milliseconds_since_midnight
+)
+
+utc = datetime.timezone.utc
+
+# QSO type utilisé quand aucun fichier n'est fourni
+sample_messages = [
+    "CQ K1ABC FN42",
+    "CQ DX 3Y0J JD15",
+    "F5UKW K1ABC -05",
+    "DL1XX 3Y0J -12",
+    "F5UKW K1ABC RR73",
+    "F5UKW K1ABC 73",
+]
+
+mode_markers = {
+    "FT8": "~",
+    "FT4": "+",
+}
+
+def records_from_file(file_path):
+    records = []
+    with open(file_path, 'r', encoding='utf-8', errors='replace') as file:
+        for line in file:
+            record = parse_decode_line(line)
+            if record is not None and record.direction == 'Rx' and record.db is not None:
+                records.append(record)
+    return records
+
+def build_decodes(records, client_id, shift_to_now):
+    decodes = []
+    offset = None
+
+    for record in records:
+        log_time = record.log_time
+        if shift_to_now:
+            # Les décodages sont ramenés à l'heure actuelle pour rester dans la fenêtre d'analyse
+            if offset is None:
+                offset = datetime.datetime.now(utc) - log_time
+                offset -= datetime.timedelta(seconds=offset.total_seconds() % 15)
+            log_time = log_time + offset
+
+        decodes.append((log_time, Decode(
+            client_id,
+            True,
+            milliseconds_since_midnight(log_time),
+            int(record.db),
+            float(record.dt),
+            int(record.hz),
+            mode_markers.get(record.mode, "~"),
+            record.message
+        )))
+
+    return decodes
+
+def build_sample_decodes(client_id):
+    # Un décodage par séquence de 15 secondes, jusqu'à la séquence courante
+    now = datetime.datetime.now(utc)
+    start = now.replace(second=now.second - now.second % 15, microsecond=0) - datetime.timedelta(seconds=15 * (len(sample_messages) - 1))
+    decodes = []
+    for index, message in enumerate(sample_messages):
+        log_time = start + datetime.timedelta(seconds=15 * index)
+        decodes.append((log_time, Decode(client_id, True, milliseconds_since_midnight(log_time), -10, 0.1, 1500 + index * 100, "~", message)))
+    return decodes
+
+def replay(decodes, host, port, client_id, dial_frequency, speed, sent_times):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    sock.sendto(encode_message(Heartbeat(client_id, 3, "2.7.0", "replay")), (host, port))
+    sock.sendto(encode_message(Status(client_id, dial_frequency, "FT8", de_call="F5UKW")), (host, port))
+
+    previous_time = None
+    for log_time, decode in decodes:
+        if speed > 0 and previous_time is not None and log_time > previous_time:
+            # Respect de l'écart entre séquences, divisé par la vitesse
+            time.sleep((log_time - previous_time).total_seconds() / speed)
+        previous_time = log_time
+
+        sent_times.append(time.perf_counter())
+        sock.sendto(encode_message(decode), (host, port))
+
+    sock.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Rejeu d'un ALL.TXT sous forme de messages UDP WSJT-X")
+    parser.add_argument("--file", help="Fichier ALL.TXT à rejouer (QSO type si absent)")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse de destination")
+    parser.add_argument("--port", type=int, default=default_udp_port, help="Port de destination")
+    parser.add_argument("--id", default="WSJT-X", help="Identifiant de l'instance simulée")
+    parser.add_argument("--dial-frequency", type=int, default=14074000, help="Fréquence affichée (Hz)")
+    parser.add_argument("--speed", type=float, default=0, help="Vitesse de rejeu (1 = temps réel, 0 = au plus vite)")
+    parser.add_argument("--keep-time", action="store_true", help="Conserver l'horodatage d'origine des décodages")
+    parser.add_argument("--check", action="store_true", help="Ecoute locale des datagrammes et mesure de la latence")
+    args = parser.parse_args()
+
+    if args.file:
+        decodes = build_decodes(records_from_file(args.file), args.id, not args.keep_time)
+    else:
+        decodes = build_sample_decodes(args.id)
+
+    print(f"{len(decodes):,} décodages à envoyer vers {args.host}:{args.port}")
+
+    sent_times = []
+
+    if not args.check:
+        replay(decodes, args.host, args.port, args.id, args.dial_frequency, args.speed, sent_times)
+        print(f"{len(sent_times):,} décodages envoyés")
+        return
+
+    # Le récepteur est le même que celui utilisé par wait_and_pounce
+    listener = UdpDecodeListener(args.host, args.port)
+    sender = threading.Thread(target=replay, args=(decodes, args.host, args.port, args.id, args.dial_frequency, args.speed, sent_times))
+
+    received = []
+    latencies = []
+    start = time.perf_counter()
+    sender.start()
+
+    while len(received) < len(decodes):
+        records = listener.read_new_records(1)
+        if not records:
+            if not sender.is_alive():
+                break
+            continue
+        now = time.perf_counter()
+        for record in records:
+            if len(received) < len(sent_times):
+                latencies.append(now - sent_times[len(received)])
+            received.append(record)
+
+    duration = time.perf_counter() - start
+    sender.join()
+    listener.close()
+
+    print(f"{len(received):,} décodages reçus en {duration:.3f}s ({len(received) / max(duration, 1e-9):,.0f}/s)")
+    if latencies:
+        latencies.sort()
+        print(f"Latence envoi -> DecodeRecord: médiane {latencies[len(latencies) // 2] * 1000:.3f} ms, max {latencies[-1] * 1000:.3f} ms")
+    for record in received[:10]:
+        print(f"  {record.line}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+from console_colors import (
+    black_on_purple,
+    black_on_yellow,
+    bright_green,
+    white_on_blue,
+    white_on_red
+)
+from decode_record import jtdx_mode_markers
+from message_classifier import MESSAGE_CQ
+from pounce_engine import (
+    ACTION_ENABLE_TX,
+    ACTION_HALT_TX,
+    ACTION_LOG_QSO,
+    ACTION_PREPARE,
+    ACTION_QSY,
+    ACTION_SET_TX_PERIOD
+)
+from wsjtx_protocol import (
+    Configure,
+    FreeText,
+    HaltTx,
+    MessageEncoder,
+    Reply,
+    milliseconds_since_midnight
+)
+
+# Caractère de mode attendu par l'instance dans un Reply
+mode_markers = {mode: marker for marker, mode in jtdx_mode_markers.items()}
+
+class UdpControlBackend:
+    # Pilotage de l'instance par les messages UDP Reply, HaltTx, Configure et FreeText
+    # à la place des clics. Les actions sans équivalent dans le protocole (QSY, log du QSO)
+    # sont confiées au backend de repli s'il existe
+    def __init__(self, listener, your_callsign, fallback=None):
+        self.listener = listener
+        self.your_callsign = your_callsign
+        self.fallback = fallback
+        self.tx_period_intent = None
+        # Tampon d'encodage réutilisé pour chaque commande
+        self.encoder = MessageEncoder()
+
+    def client_id(self):
+        return self.listener.client_id
+
+    def send(self, packet):
+        if not self.listener.send(packet):
+            print(white_on_red("Instance UDP inconnue, aucun message envoyé."))
+            return False
+        return True
+
+    def handle(self, intent):
+        if intent.action == ACTION_PREPARE:
+            return self.prepare(intent.callsign)
+        elif intent.action == ACTION_SET_TX_PERIOD:
+            # La période d'émission est choisie par l'instance lors du Reply,
+            # elle n'est transmise au backend de repli que si le Reply est impossible
+            self.tx_period_intent = intent
+            return None
+        elif intent.action == ACTION_ENABLE_TX:
+            return self.enable_tx(intent)
+        elif intent.action == ACTION_HALT_TX:
+            return self.halt_tx(False)
+        elif intent.action == ACTION_LOG_QSO:
+            self.halt_tx(True)
+            if self.fallback is not None:
+                return self.fallback.handle(intent)
+            return False
+        elif intent.action == ACTION_QSY:
+            if self.fallback is not None:
+                return self.fallback.handle(intent)
+            print(f"Changement de fréquence {black_on_purple(str(intent.frequency))} impossible par UDP.")
+
+        return None
+
+    def prepare(self, callsign):
+        if callsign is None:
+            return False
+
+        # Mise à jour du DX Call et génération des messages
+        self.send(self.encoder.encode(Configure(self.client_id(), dx_call=callsign, generate_messages=True)))
+        print(f"Préparation indicatif {callsign} {bright_green('[UDP Configure]')}")
+        return True
+
+    def is_replyable(self, record):
+        # L'instance ne traite un Reply que pour un CQ ou un message qui nous est adressé
+        for message in record.messages:
+            if message.message_type == MESSAGE_CQ or message.call1 == self.your_callsign:
+                return True
+        return False
+
+    def enable_tx(self, intent):
+        if self.listener.state.is_tx_enabled_for(intent.callsign):
+            print(f"{white_on_red('Enable TX')} actif. Aucun envoi. Le monitoring se poursuit.")
+            return None
+
+        record = intent.record
+        if record is None or record.db is None or not self.is_replyable(record):
+            if self.fallback is not None:
+                if self.tx_period_intent is not None:
+                    self.fallback.handle(self.tx_period_intent)
+                    self.tx_period_intent = None
+                return self.fallback.handle(intent)
+            print(f"{black_on_yellow('Enable TX')} en attente d'un CQ ou d'une réponse de {bright_green(intent.callsign)}.")
+            return None
+
+        reply = Reply(
+            self.client_id(),
+            milliseconds_since_midnight(record.log_time),
+            int(record.db),
+            float(record.dt),
+            int(record.hz),
+            mode_markers.get(record.mode, record.mode),
+            record.message
+        )
+        if self.send(self.encoder.encode(reply)):
+            print(f"{black_on_yellow('Enable TX')} inactif. {white_on_blue('Reply')} envoyé pour {record.message}.")
+        return None
+
+    def halt_tx(self, auto_tx_only):
+        self.send(self.encoder.encode(HaltTx(self.client_id(), auto_tx_only)))
+        return False
+
+    def send_free_text(self, text, send=False):
+        return self.send(self.encoder.encode(FreeText(self.client_id(), text, send)))
@@ -0,0 +1,186 @@
+import socket
+import select
+import datetime
+import collections
+
+from clock_service import get_clock
+from decode_record import (
+    DecodeRecord,
+    jtdx_mode_markers,
+    strip_decode_flags,
+    wsjt_flags_pattern
+)
+from instance_state import InstanceState
+from log_analysis import get_log_time
+from wsjtx_protocol import (
+    MESSAGE_CLEAR,
+    MESSAGE_CLOSE,
+    MESSAGE_DECODE,
+    MESSAGE_HEARTBEAT,
+    MESSAGE_QSO_LOGGED,
+    MESSAGE_STATUS,
+    decode_message
+)
+
+# Port UDP par défaut de WSJT-X et JTDX
+default_udp_port = 2237
+
+# Taille maximale d'un datagramme
+max_datagram_size = 65535
+
+# Tampon de réception pour absorber les rafales de décodages en fin de séquence
+receive_buffer_size = 4 * 1024 * 1024
+
+utc = datetime.timezone.utc
+
+def decode_time_to_datetime(milliseconds, now):
+    # L'heure du décodage ne contient pas de date: un décodage de 23:59:45
+    # reçu après minuit appartient à la veille
+    moment = datetime.datetime(now.year, now.month, now.day, tzinfo=utc) + datetime.timedelta(milliseconds=milliseconds)
+    if moment - now > datetime.timedelta(hours=1):
+        moment -= datetime.timedelta(days=1)
+    return moment
+
+def decode_to_record(decode, dial_frequency=None, now=None):
+    if now is None:
+        now = get_clock().now()
+
+    moment = decode_time_to_datetime(decode.time, now)
+    log_time_str = moment.strftime("%y%m%d_%H%M%S")
+    log_time = get_log_time(log_time_str)
+
+    mode = jtdx_mode_markers.get(decode.mode, decode.mode)
+    db = str(decode.snr)
+    dt = f"{decode.delta_time:.1f}"
+    hz = str(decode.delta_frequency)
+    frequency = f"{dial_frequency / 1000000:.3f}" if dial_frequency else "0.000"
+
+    # Ligne au format ALL.TXT de WSJT-X pour l'affichage
+    line = f"{log_time_str} {frequency:>9} Rx {mode:<6}{db:>4} {dt:>4} {hz:>4} {decode.message}"
+    tokens = strip_decode_flags(decode.message.split(), wsjt_flags_pattern)
+
+    return DecodeRecord(line, log_time_str, log_time, 'Rx', mode, db, dt, hz, tokens)
+
+def is_multicast_address(host):
+    try:
+        first_byte = int(host.split('.')[0])
+    except ValueError:
+        return False
+    return 224 <= first_byte <= 239
+
+class UdpDecodeListener:
+    # Réception des messages UDP de WSJT-X / JTDX à la place de la lecture de ALL.TXT
+    def __init__(self, host="127.0.0.1", port=default_udp_port, max_logged_qsos=100, clock=None):
+        self.host = host
+        self.port = port
+        self.clock = clock if clock is not None else get_clock()
+
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, receive_buffer_size)
+
+        if is_multicast_address(host):
+            self.sock.bind(('', port))
+            membership = socket.inet_aton(host) + socket.inet_aton('0.0.0.0')
+            self.sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        else:
+            self.sock.bind((host, port))
+
+        self.sock.setblocking(False)
+
+        # Les datagrammes sont reçus dans un tampon unique et analysés sans copie
+        self.receive_buffer = bytearray(max_datagram_size)
+        self.receive_view = memoryview(self.receive_buffer)
+
+        # Dernier état connu de l'instance
+        self.client_id = None
+        self.client_address = None
+        self.heartbeat = None
+        self.status = None
+        # Reflet de l'état de l'instance mis à jour par les messages Status
+        self.state = InstanceState(self.clock)
+        self.logged_qsos = collections.deque(maxlen=max_logged_qsos)
+        self.last_packet_time = None
+        self.closed_by_client = False
+        self.cleared = False
+        # Décodages reçus pendant l'attente du premier message de l'instance
+        self.early_records = []
+
+    def handle_datagram(self, data, address, records):
+        decoded = decode_message(data)
+        if decoded is None:
+            return
+
+        message_type, message = decoded
+        self.last_packet_time = self.clock.time()
+        self.client_address = address
+        self.state.on_packet()
+
+        if message is not None and message.id is not None:
+            self.client_id = message.id
+
+        if message_type == MESSAGE_DECODE:
+            if message.new and message.message:
+                dial_frequency = self.status.dial_frequency if self.status is not None else None
+                records.append(decode_to_record(message, dial_frequency, self.clock.now()))
+        elif message_type == MESSAGE_STATUS:
+            self.status = message
+            self.state.on_status(message)
+        elif message_type == MESSAGE_HEARTBEAT:
+            self.heartbeat = message
+        elif message_type == MESSAGE_QSO_LOGGED:
+            self.logged_qsos.append(message)
+        elif message_type == MESSAGE_CLEAR:
+            self.cleared = True
+        elif message_type == MESSAGE_CLOSE:
+            self.closed_by_client = True
+            self.state.on_close()
+
+    def read_new_records(self, timeout=None):
+        # Attente du premier datagramme puis lecture de tous ceux en attente
+        records = []
+
+        readable, _, _ = select.select([self.sock], [], [], timeout)
+        if not readable:
+            return records
+
+        while True:
+            try:
+                size, address = self.sock.recvfrom_into(self.receive_buffer)
+            except (BlockingIOError, InterruptedError):
+                break
+            except ConnectionResetError:
+                # Windows signale ainsi un ICMP port unreachable
+                continue
+            self.handle_datagram(self.receive_view[:size], address, records)
+
+        return records
+
+    def wait_for_client(self, timeout):
+        # L'adresse de l'instance n'est connue qu'à la réception de son premier message
+        clock = self.clock
+        deadline = clock.monotonic() + timeout
+        while self.client_address is None:
+            remaining = deadline - clock.monotonic()
+            if remaining <= 0:
+                return False
+            started = clock.monotonic()
+            self.early_records.extend(self.read_new_records(remaining))
+            if self.client_address is None and clock.monotonic() == started:
+                # Horloge virtuelle: le temps simulé n'avance pas pendant select
+                clock.sleep(remaining)
+        return True
+
+    def take_early_records(self):
+        records, self.early_records = self.early_records, []
+        return records
+
+    def send(self, packet):
+        # Les commandes sont renvoyées à l'instance depuis le port d'écoute
+        if self.client_address is None:
+            return False
+        self.sock.sendto(packet, self.client_address)
+        return True
+
+    def close(self):
+        self.sock.close()
@@ -0,0 +1,502 @@
+import struct
+import datetime
+import threading
+
+# Protocole UDP de WSJT-X (NetworkMessage.hpp), repris par JTDX
+# Les champs sont sérialisés par QDataStream en big endian. Les chaînes sont
+# des QByteArray UTF-8 (et non des QString UTF-16): longueur sur 32 bits puis octets
+MAGIC = 0xadbccbda
+SCHEMA = 2
+
+MESSAGE_HEARTBEAT = 0
+MESSAGE_STATUS = 1
+MESSAGE_DECODE = 2
+MESSAGE_CLEAR = 3
+MESSAGE_REPLY = 4
+MESSAGE_QSO_LOGGED = 5
+MESSAGE_CLOSE = 6
+MESSAGE_REPLAY = 7
+MESSAGE_HALT_TX = 8
+MESSAGE_FREE_TEXT = 9
+MESSAGE_WSPR_DECODE = 10
+MESSAGE_LOCATION = 11
+MESSAGE_LOGGED_ADIF = 12
+MESSAGE_HIGHLIGHT_CALLSIGN = 13
+MESSAGE_SWITCH_CONFIGURATION = 14
+MESSAGE_CONFIGURE = 15
+
+# Taille maximale d'un datagramme
+MAX_MESSAGE_SIZE = 65535
+
+# QByteArray nul
+NULL_LENGTH = 0xffffffff
+
+# QTime invalide, et valeur d'un champ numérique de Configure laissé inchangé
+INVALID_TIME = 0xffffffff
+CONFIGURE_NO_CHANGE = 0xffffffff
+
+# Jour julien du 1er janvier 1970 et QDate nulle
+JULIAN_DAY_EPOCH = 2440588
+NULL_JULIAN_DAY = -0x8000000000000000
+
+# Qt::TimeSpec d'un QDateTime
+TIMESPEC_LOCAL = 0
+TIMESPEC_UTC = 1
+TIMESPEC_OFFSET = 2
+TIMESPEC_TIMEZONE = 3
+
+# QColor::Spec
+COLOR_INVALID = 0
+COLOR_RGB = 1
+
+utc = datetime.timezone.utc
+epoch = datetime.datetime(1970, 1, 1, tzinfo=utc)
+
+# Types des champs
+BOOL = '?'
+QUINT8 = 'B'
+QINT32 = 'i'
+QUINT32 = 'I'
+QINT64 = 'q'
+QUINT64 = 'Q'
+# QDataStream écrit les float en double précision par défaut
+DOUBLE = 'd'
+# Millisecondes depuis minuit
+QTIME = 'I'
+UTF8 = 'utf8'
+QDATETIME = 'qdatetime'
+QCOLOR = 'qcolor'
+
+header_struct = struct.Struct('>III')
+length_struct = struct.Struct('>I')
+datetime_struct = struct.Struct('>qIB')
+offset_struct = struct.Struct('>i')
+color_struct = struct.Struct('>bHHHHH')
+
+def milliseconds_since_midnight(moment):
+    return ((moment.hour * 60 + moment.minute) * 60 + moment.second) * 1000 + moment.microsecond // 1000
+
+# Lecture directe depuis un memoryview: seules les chaînes finales sont créées
+def read_utf8(view, offset):
+    length = length_struct.unpack_from(view, offset)[0]
+    offset += 4
+    if length == NULL_LENGTH:
+        return None, offset
+    end = offset + length
+    if end > len(view):
+        raise ValueError("QByteArray tronqué")
+    return str(view[offset:end], 'utf-8', 'replace'), end
+
+def read_qdatetime(view, offset):
+    julian_day, milliseconds, timespec = datetime_struct.unpack_from(view, offset)
+    offset += datetime_struct.size
+
+    utc_offset = 0
+    if timespec == TIMESPEC_OFFSET:
+        utc_offset = offset_struct.unpack_from(view, offset)[0]
+        offset += 4
+    elif timespec == TIMESPEC_TIMEZONE:
+        _, offset = read_utf8(view, offset)
+
+    if julian_day == NULL_JULIAN_DAY:
+        return None, offset
+    if milliseconds == INVALID_TIME:
+        milliseconds = 0
+
+    moment = epoch + datetime.timedelta(days=julian_day - JULIAN_DAY_EPOCH, milliseconds=milliseconds, seconds=-utc_offset)
+    return moment, offset
+
+def read_qcolor(view, offset):
+    spec, alpha, red, green, blue, _ = color_struct.unpack_from(view, offset)
+    offset += color_struct.size
+    if spec == COLOR_INVALID:
+        return None, offset
+    # Composantes 16 bits ramenées sur 8 bits: (rouge, vert, bleu, alpha)
+    return (red >> 8, green >> 8, blue >> 8, alpha >> 8), offset
+
+# Ecriture dans un tampon préalloué
+def write_utf8(view, offset, value):
+    if value is None:
+        length_struct.pack_into(view, offset, NULL_LENGTH)
+        return offset + 4
+    encoded = value.encode('utf-8')
+    end = offset + 4 + len(encoded)
+    if end > len(view):
+        raise ValueError("Message trop long")
+    length_struct.pack_into(view, offset, len(encoded))
+    view[offset + 4:end] = encoded
+    return end
+
+def write_qdatetime(view, offset, value):
+    if value is None:
+        datetime_struct.pack_into(view, offset, NULL_JULIAN_DAY, INVALID_TIME, TIMESPEC_UTC)
+        return offset + datetime_struct.size
+    if value.tzinfo is not None:
+        value = value.astimezone(utc)
+    julian_day = value.toordinal() - epoch.toordinal() + JULIAN_DAY_EPOCH
+    datetime_struct.pack_into(view, offset, julian_day, milliseconds_since_midnight(value), TIMESPEC_UTC)
+    return offset + datetime_struct.size
+
+def write_qcolor(view, offset, value):
+    if value is None:
+        color_struct.pack_into(view, offset, COLOR_INVALID, 0xffff, 0, 0, 0, 0)
+    else:
+        red, green, blue, alpha = value
+        color_struct.pack_into(view, offset, COLOR_RGB, alpha * 0x101, red * 0x101, green * 0x101, blue * 0x101, 0)
+    return offset + color_struct.size
+
+variable_readers = {
+    UTF8: read_utf8,
+    QDATETIME: read_qdatetime,
+    QCOLOR: read_qcolor,
+}
+
+variable_writers = {
+    UTF8: write_utf8,
+    QDATETIME: write_qdatetime,
+    QCOLOR: write_qcolor,
+}
+
+class ProtocolMessage:
+    # Chaque message déclare ses champs dans l'ordre du protocole (l'identifiant exclu):
+    # (nom, type, valeur par défaut). Les champs à partir de first_optional_field
+    # sont absents des anciennes versions et de JTDX
+    __slots__ = ('id',)
+    message_type = None
+    fields = ()
+    first_optional_field = None
+
+    def __init__(self, id, *args, **kwargs):
+        self.id = id
+        for index, (name, _, default) in enumerate(self.fields):
+            if index < len(args):
+                value = args[index]
+            else:
+                value = kwargs.pop(name, default)
+            setattr(self, name, value)
+        if kwargs:
+            raise TypeError(f"Champs inconnus pour {type(self).__name__}: {', '.join(kwargs)}")
+
+    def __eq__(self, other):
+        if type(self) is not type(other) or self.id != other.id:
+            return False
+        for name, _, _ in self.fields:
+            if getattr(self, name) != getattr(other, name):
+                return False
+        return True
+
+    def __repr__(self):
+        values = ", ".join(f"{name}={getattr(self, name)!r}" for name, _, _ in self.fields)
+        return f"{type(self).__name__}(id={self.id!r}, {values})"
+
+class Heartbeat(ProtocolMessage):
+    message_type = MESSAGE_HEARTBEAT
+    fields = (
+        ('max_schema', QUINT32, 3),
+        ('version', UTF8, ""),
+        ('revision', UTF8, ""),
+    )
+    first_optional_field = 1
+    __slots__ = tuple(name for name, _, _ in fields)
+
+class Status(ProtocolMessage):
+    message_type = MESSAGE_STATUS
+    fields = (
+        ('dial_frequency', QUINT64, 0),
+        ('mode', UTF8, ""),
+        ('dx_call', UTF8, ""),
+        ('report', UTF8, ""),
+        ('tx_mode', UTF8, ""),
+        ('tx_enabled', BOOL, False),
+        ('transmitting', BOOL, False),
+        ('decoding', BOOL, False),
+        ('rx_df', QUINT32, 0),
+        ('tx_df', QUINT32, 0),
+        ('de_call', UTF8, ""),
+        ('de_grid', UTF8, ""),
+        ('dx_grid', UTF8, ""),
+        ('tx_watchdog', BOOL, False),
+        ('submode', UTF8, ""),
+        ('fast_mode', BOOL, False),
+        ('special_operation_mode', QUINT8, 0),
+        ('frequency_tolerance', QUINT32, CONFIGURE_NO_CHANGE),
+        ('tr_period', QUINT32, CONFIGURE_NO_CHANGE),
+        ('configuration_name', UTF8, ""),
+        ('tx_message', UTF8, ""),
+    )
+    first_optional_field = 13
+    __slots__ = tuple(name for name, _, _ in fields)
+
+class Decode(ProtocolMessage):
+    message_type = MESSAGE_DECODE
+    fields = (
+        ('new', BOOL, True),
+        ('time', QTIME, 0),
+        ('snr', QINT32, 0),
+        ('delta_time', DOUBLE, 0.0),
+        ('delta_frequency', QUINT32, 0),
+        ('mode', UTF8, ""),
+        ('message', UTF8, ""),
+        ('low_confidence', BOOL, False),
+        ('off_air', BOOL, False),
+    )
+    first_optional_field = 7
+    __slots__ = tuple(name for name, _, _ in fields)
+
+class Clear(ProtocolMessage):
+    message_type = MESSAGE_CLEAR
+    # 0: Band Activity, 1: Rx Frequency, 2: les deux
+    fields = (
+        ('window', QUINT8, 0),
+    )
+    first_optional_field = 0
+    __slots__ = tuple(name for name, _, _ in fields)
+
+class Reply(ProtocolMessage):
+    # Equivalent d'un double clic sur le décodage
+    message_type = MESSAGE_REPLY
+    fields = (
+        ('time', QTIME, 0),
+        ('snr', QINT32, 0),
+        ('delta_time', DOUBLE, 0.0),
+        ('delta_frequency', QUINT32, 0),
+        ('mode', UTF8, ""),
+        ('message', UTF8, ""),
+        ('low_confidence', BOOL, False),
+        ('modifiers', QUINT8, 0),
+    )
+    first_optional_field = 6
+    __slots__ = tuple(name for name, _, _ in fields)
+
+class QSOLogged(ProtocolMessage):
+    message_type = MESSAGE_QSO_LOGGED
+    fields = (
+        ('time_off', QDATETIME, None),
+        ('dx_call', UTF8, ""),
+        ('dx_grid', UTF8, ""),
+        ('tx_frequency', QUINT64, 0),
+        ('mode', UTF8, ""),
+        ('report_sent', UTF8, ""),
+        ('report_received', UTF8, ""),
+        ('tx_power', UTF8, ""),
+        ('comments', UTF8, ""),
+        ('name', UTF8, ""),
+        ('time_on', QDATETIME, None),
+        ('operator_call', UTF8, ""),
+        ('my_call', UTF8, ""),
+        ('my_grid', UTF8, ""),
+        ('exchange_sent', UTF8, ""),
+        ('exchange_received', UTF8, ""),
+        ('adif_propagation_mode', UTF8, ""),
+    )
+    first_optional_field = 7
+    __slots__ = tuple(name for name, _, _ in fields)
+
+class Close(ProtocolMessage):
+    message_type = MESSAGE_CLOSE
+    __slots__ = ()
+
+class Replay(ProtocolMessage):
+    message_type = MESSAGE_REPLAY
+    __slots__ = ()
+
+class HaltTx(ProtocolMessage):
+    message_type = MESSAGE_HALT_TX
+    fields = (
+        ('auto_tx_only', BOOL, False),
+    )
+    __slots__ = tuple(name for name, _, _ in fields)
+
+class FreeText(ProtocolMessage):
+    message_type = MESSAGE_FREE_TEXT
+    fields = (
+        ('text', UTF8, ""),
+        ('send', BOOL, False),
+    )
+    first_optional_field = 1
+    __slots__ = tuple(name for name, _, _ in fields)
+
+class WSPRDecode(ProtocolMessage):
+    message_type = MESSAGE_WSPR_DECODE
+    fields = (
+        ('new', BOOL, True),
+        ('time', QTIME, 0),
+        ('snr', QINT32, 0),
+        ('delta_time', DOUBLE, 0.0),
+        ('frequency', QUINT64, 0),
+        ('drift', QINT32, 0),
+        ('callsign', UTF8, ""),
+        ('grid', UTF8, ""),
+        ('power', QINT32, 0),
+        ('off_air', BOOL, False),
+    )
+    first_optional_field = 9
+    __slots__ = tuple(name for name, _, _ in fields)
+
+class Location(ProtocolMessage):
+    message_type = MESSAGE_LOCATION
+    fields = (
+        ('location', UTF8, ""),
+    )
+    __slots__ = tuple(name for name, _, _ in fields)
+
+class LoggedADIF(ProtocolMessage):
+    message_type = MESSAGE_LOGGED_ADIF
+    fields = (
+        ('adif_text', UTF8, ""),
+    )
+    __slots__ = tuple(name for name, _, _ in fields)
+
+class HighlightCallsign(ProtocolMessage):
+    # Couleurs (rouge, vert, bleu, alpha), None pour retirer la mise en évidence
+    message_type = MESSAGE_HIGHLIGHT_CALLSIGN
+    fields = (
+        ('callsign', UTF8, ""),
+        ('background_color', QCOLOR, None),
+        ('foreground_color', QCOLOR, None),
+        ('highlight_last', BOOL, False),
+    )
+    __slots__ = tuple(name for name, _, _ in fields)
+
+class SwitchConfiguration(ProtocolMessage):
+    message_type = MESSAGE_SWITCH_CONFIGURATION
+    fields = (
+        ('configuration_name', UTF8, ""),
+    )
+    __slots__ = tuple(name for name, _, _ in fields)
+
+class Configure(ProtocolMessage):
+    # Les chaînes vides et CONFIGURE_NO_CHANGE laissent le réglage de l'instance inchangé
+    message_type = MESSAGE_CONFIGURE
+    fields = (
+        ('mode', UTF8, ""),
+        ('frequency_tolerance', QUINT32, CONFIGURE_NO_CHANGE),
+        ('submode', UTF8, ""),
+        ('fast_mode', BOOL, False),
+        ('tr_period', QUINT32, CONFIGURE_NO_CHANGE),
+        ('rx_df', QUINT32, CONFIGURE_NO_CHANGE),
+        ('dx_call', UTF8, ""),
+        ('dx_grid', UTF8, ""),
+        ('generate_messages', BOOL, False),
+    )
+    __slots__ = tuple(name for name, _, _ in fields)
+
+message_classes = (
+    Heartbeat,
+    Status,
+    Decode,
+    Clear,
+    Reply,
+    QSOLogged,
+    Close,
+    Replay,
+    HaltTx,
+    FreeText,
+    WSPRDecode,
+    Location,
+    LoggedADIF,
+    HighlightCallsign,
+    SwitchConfiguration,
+    Configure,
+)
+
+class MessageCodec:
+    # Les champs de taille fixe consécutifs sont regroupés dans un seul struct.Struct
+    def __init__(self, message_class):
+        self.message_class = message_class
+        self.names = ('id',) + tuple(name for name, _, _ in message_class.fields)
+        self.defaults = tuple(default for _, _, default in message_class.fields)
+        self.operations = []
+
+        first_optional_field = message_class.first_optional_field
+        formats = []
+        for index, (_, field_type, _) in enumerate(message_class.fields):
+            optional = first_optional_field is not None and index >= first_optional_field
+            if field_type in variable_readers or optional:
+                if formats:
+                    self.operations.append((struct.Struct('>' + ''.join(formats)), len(formats), None, None, False))
+                    formats = []
+                if field_type in variable_readers:
+                    self.operations.append((None, 1, variable_readers[field_type], variable_writers[field_type], optional))
+                else:
+                    self.operations.append((struct.Struct('>' + field_type), 1, None, None, True))
+            else:
+                formats.append(field_type)
+        if formats:
+            self.operations.append((struct.Struct('>' + ''.join(formats)), len(formats), None, None, False))
+
+    def decode(self, view, offset, id):
+        values = [id]
+        size = len(view)
+
+        for packer, _, reader, _, optional in self.operations:
+            if optional and offset >= size:
+                # Champs optionnels absents du datagramme
+                values += self.defaults[len(values) - 1:]
+                break
+            if packer is not None:
+                values += packer.unpack_from(view, offset)
+                offset += packer.size
+            else:
+                value, offset = reader(view, offset)
+                values.append(value)
+
+        message = self.message_class.__new__(self.message_class)
+        for name, value in zip(self.names, values):
+            setattr(message, name, value)
+        return message
+
+    def encode(self, message, view, offset):
+        names = self.names
+        index = 1
+        for packer, count, _, writer, _ in self.operations:
+            if packer is not None:
+                packer.pack_into(view, offset, *[getattr(message, name) for name in names[index:index + count]])
+                offset += packer.size
+            else:
+                offset = writer(view, offset, getattr(message, names[index]))
+            index += count
+        return offset
+
+codecs = {message_class.message_type: MessageCodec(message_class) for message_class in message_classes}
+
+def decode_message(data):
+    # Retourne (type, message) ou None si le datagramme n'est pas exploitable
+    # data peut être un bytes, un bytearray ou un memoryview: aucune copie intermédiaire
+    view = data if isinstance(data, memoryview) else memoryview(data)
+    try:
+        magic, _, message_type = header_struct.unpack_from(view, 0)
+        if magic != MAGIC:
+            return None
+        id, offset = read_utf8(view, header_struct.size)
+
+        codec = codecs.get(message_type)
+        if codec is None:
+            return message_type, None
+        return message_type, codec.decode(view, offset, id)
+    except (struct.error, ValueError, OverflowError):
+        return None
+
+class MessageEncoder:
+    # Encodage dans un tampon préalloué, réutilisé d'un message à l'autre:
+    # le memoryview retourné n'est valable que jusqu'à l'encodage suivant
+    def __init__(self, buffer_size=MAX_MESSAGE_SIZE, schema=SCHEMA):
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+        self.schema = schema
+
+    def encode(self, message):
+        view = self.view
+        header_struct.pack_into(view, 0, MAGIC, self.schema, message.message_type)
+        offset = write_utf8(view, header_struct.size, message.id)
+        offset = codecs[message.message_type].encode(message, view, offset)
+        return view[:offset]
+
+# Un encodeur par thread pour encode_message
+thread_encoders = threading.local()
+
+def encode_message(message):
+    encoder = getattr(thread_encoders, 'encoder', None)
+    if encoder is None:
+        encoder = thread_encoders.encoder = MessageEncoder()
+    return bytes(encoder.encode(message))